@@ -20,6 +20,9 @@ document.addEventListener('DOMContentLoaded', () => {
     // ANSI to HTML converter
     const ansiUp = new AnsiUp();
     
+    // Decoder for binary WebSocket frames
+    const textDecoder = new TextDecoder();
+    
     // Show/hide H2 payload placement based on selected types
     function updateH2PayloadVisibility() {
         const h2Selected = Array.from(typeCheckboxes).some(cb => 
@@ -318,6 +321,8 @@ document.addEventListener('DOMContentLoaded', () => {
         
         // Create WebSocket connection
         window.scanSocket = new WebSocket(wsUrl);
+        // Scan events arrive as binary frames containing UTF-8 JSON
+        window.scanSocket.binaryType = 'arraybuffer';
         
         // Connection opened
         window.scanSocket.addEventListener('open', (event) => {
@@ -345,20 +350,13 @@ document.addEventListener('DOMContentLoaded', () => {
             updateOutput('Error', true);
         });
         
-        // Send a ping every 30 seconds to keep the connection alive
-        const pingInterval = setInterval(() => {
-            if (window.scanSocket && window.scanSocket.readyState === WebSocket.OPEN) {
-                window.scanSocket.send('ping');
-            } else {
-                clearInterval(pingInterval);
-            }
-        }, 30000);
-        
         // Listen for messages
         window.scanSocket.addEventListener('message', (event) => {
             console.log('Message from server:', event.data);
             
-            let messageText = event.data;
+            let messageText = typeof event.data === 'string'
+                ? event.data
+                : textDecoder.decode(event.data);
             let messageObj = null;
             
             // Try to parse as JSON, but don't fail if it's not valid JSON
@@ -369,8 +367,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 // Handle different message types
                 switch (messageObj.type) {
                     case 'output':
-                        // Regular output message
-                        updateOutput(messageObj.data);
+                        // Regular output message, possibly a batch of lines
+                        if (Array.isArray(messageObj.lines)) {
+                            messageObj.lines.forEach(line => updateOutput(line));
+                        } else {
+                            updateOutput(messageObj.data);
+                        }
                         // Check for vulnerability findings in the accumulated output
                         if (outputArea.textContent.includes('Vulnerability_Type')) {
                             const findings = parseOutputForFindings(outputArea.textContent);
@@ -403,9 +405,6 @@ document.addEventListener('DOMContentLoaded', () => {
                         updateOutput('Error', true);
                         scanButton.disabled = false;
                         break;
-                    case 'pong':
-                        // Just a pong response, ignore
-                        break;
                     default:
                         // Unknown message type, just display as is
                         updateOutput(messageObj.data || messageText);
@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 # HTTP Request Smuggling Detector - Web Frontend Server
-# This script provides a web-based frontend for the hrs_finder CLI tool
+# This script provides a web-based frontend for the hrs_finder scanner
 
 import os
 import sys
 import json
 import asyncio
 import logging
+import logging.handlers
+import queue
+import atexit
 import argparse
 import datetime
-from typing import Dict, List, Optional, Any
-import uuid
+import hashlib
+import contextlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import secrets
 import signal
 from pathlib import Path
 
@@ -21,27 +26,58 @@ if parent_dir not in sys.path:
 
 try:
     from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
-    from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+    from fastapi.responses import JSONResponse, HTMLResponse, Response
     from fastapi.staticfiles import StaticFiles
     from fastapi.middleware.cors import CORSMiddleware
     from pydantic import BaseModel, Field
+    import orjson
     import uvicorn
 except ImportError:
     print("Required packages not found. Installing dependencies...")
     import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "fastapi", "uvicorn", "websockets", "pydantic"])
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "fastapi", "uvicorn", "websockets", "pydantic", "orjson"])
     from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
-    from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+    from fastapi.responses import JSONResponse, HTMLResponse, Response
     from fastapi.staticfiles import StaticFiles
     from fastapi.middleware.cors import CORSMiddleware
     from pydantic import BaseModel, Field
+    import orjson
     import uvicorn
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Optional accelerators: uvloop event loop and httptools HTTP parser.
+# uvloop is not available on Windows, so fall back to the stock implementations.
+try:
+    import uvloop  # noqa: F401
+    LOOP_IMPL = "uvloop"
+except ImportError:
+    LOOP_IMPL = "asyncio"
+
+try:
+    import httptools  # noqa: F401
+    HTTP_IMPL = "httptools"
+except ImportError:
+    HTTP_IMPL = "h11"
+
+# Optional Redis pub/sub for sharing WebSocket delivery across worker processes
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+from src.cli.main import run_scan_api
+
+# Configure logging. Records are queued and written to stderr by a background
+# thread, so logging never blocks the event loop on a write().
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+# Only merge the arguments into the message here; the listener adds the rest
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger("hrs_finder_frontend")
 
 # ------------------- Models for request validation -------------------
@@ -65,8 +101,19 @@ class ScanRequest(BaseModel):
 # Store WebSocket connections
 active_websockets = {}
 
-# Store running processes
-processes = {}
+# Store running scan tasks (always local to the worker running the scan)
+scans = {}
+
+# Limit how many scans run at once per worker; further scans wait for a free slot
+MAX_CONCURRENT_SCANS = int(os.environ.get("HRS_MAX_SCANS", "4"))
+scan_slots = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+
+# When HRS_REDIS_URL is set, scan events are published to a per-client Redis
+# channel and forwarded by whichever worker holds that client's WebSocket
+REDIS_URL = os.environ.get("HRS_REDIS_URL")
+if REDIS_URL and aioredis is None:
+    raise RuntimeError("HRS_REDIS_URL is set but the 'redis' package is not installed")
+redis_client = aioredis.from_url(REDIS_URL) if REDIS_URL else None
 
 # Define app
 app = FastAPI(title="HTTP Request Smuggling Detector", version="1.0.0")
@@ -82,232 +129,186 @@ app.add_middleware(
 
 # ------------------- Helper functions -------------------
 
-def get_command_args(scan_request: ScanRequest) -> List[str]:
-    """Convert the ScanRequest model to command line arguments for hrs_finder"""
-    
-    # Start with the base command
-    cmd = [sys.executable, os.path.join(parent_dir, "main.py"), "scan"]
-    
-    # Add the target URL
-    cmd.append(scan_request.url)
-    
-    # Add vulnerability types if specified
-    if scan_request.types:
-        cmd.append("--type")
-        cmd.append(",".join(scan_request.types))
-    
-    # Add custom headers
-    for header in scan_request.headers:
-        cmd.append("-H")
-        cmd.append(f"{header.name}: {header.value}")
-    
-    # Add timeout
-    cmd.append("--timeout")
-    cmd.append(str(scan_request.timeout))
-    
-    # Add exit_first if enabled
-    if scan_request.exit_first:
-        cmd.append("--exit-first")
+# Maximum number of queued output lines coalesced into a single frame
+OUTPUT_BATCH_SIZE = 64
+
+async def send_obj(websocket: WebSocket, obj: Dict[str, Any]):
+    """Send a message to the client as an orjson-encoded binary frame"""
+    await websocket.send_bytes(orjson.dumps(obj))
+
+def channel_name(client_id: str) -> str:
+    """Redis channel carrying the events for a client"""
+    return f"ws:{client_id}"
+
+def event_sender(client_id: str) -> Optional[Callable[[Dict[str, Any]], Awaitable[None]]]:
+    """Resolve once how messages reach a client's WebSocket, whichever worker holds it
     
-    # Add verbose if enabled
-    if scan_request.verbose:
-        cmd.append("--verbose")
+    Returns None when the client has no WebSocket connection in this worker
+    and there is no Redis to reach other workers.
+    """
+    if redis_client is not None:
+        publish = redis_client.publish
+        channel = channel_name(client_id)
+        
+        async def send(obj: Dict[str, Any]):
+            await publish(channel, orjson.dumps(obj))
+        return send
     
-    # Add h2_payload_placement if any h2 type is selected
-    if "h2.cl" in scan_request.types or "h2.te" in scan_request.types:
-        cmd.append("--h2-payload-placement")
-        cmd.append(scan_request.h2_payload_placement)
+    websocket = active_websockets.get(client_id)
+    if websocket is None:
+        return None
+    send_bytes = websocket.send_bytes
     
-    return cmd
+    async def send(obj: Dict[str, Any]):
+        await send_bytes(orjson.dumps(obj))
+    return send
+
+async def forward_published(websocket: WebSocket, pubsub):
+    """Relay frames published on a client's Redis channel to its WebSocket"""
+    async for message in pubsub.listen():
+        if message["type"] == "message":
+            await websocket.send_bytes(message["data"])
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
+    # Subscribe before accepting so no published event can be missed
+    pubsub = None
+    forwarder = None
+    if redis_client is not None:
+        pubsub = redis_client.pubsub()
+        await pubsub.subscribe(channel_name(client_id))
+    
     await websocket.accept()
-    logger.info(f"WebSocket connection accepted for client: {client_id}")
+    logger.info("WebSocket connection accepted for client: %s", client_id)
     
     # Store the WebSocket connection
     active_websockets[client_id] = websocket
     
     try:
+        if pubsub is not None:
+            forwarder = asyncio.create_task(forward_published(websocket, pubsub))
+        
         # Send initial message
-        await websocket.send_json({"type": "info", "data": "Connected. Waiting for scan to start..."})
-        logger.info(f"Sent initial connection message to client {client_id}")
+        await send_obj(websocket, {"type": "info", "data": "Connected. Waiting for scan to start..."})
+        logger.debug("Sent initial connection message to client %s", client_id)
         
-        # Keep the connection open until client disconnects
+        # Keep the connection open until client disconnects; keep-alive is
+        # handled by protocol-level ping/pong frames in the server
         while True:
-            data = await websocket.receive_text()
-            if data == "ping":
-                logger.info(f"Received ping from client {client_id}")
-                await websocket.send_json({"type": "pong", "data": "pong"})
+            await websocket.receive_text()
     
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected for client: {client_id}")
+        logger.info("WebSocket disconnected for client: %s", client_id)
     except Exception as e:
-        logger.error(f"Error in WebSocket handler: {str(e)}")
+        logger.error("Error in WebSocket handler: %s", e)
     finally:
         # Clean up
-        logger.info(f"Cleaning up WebSocket for client {client_id}")
+        logger.debug("Cleaning up WebSocket for client %s", client_id)
         if client_id in active_websockets:
             del active_websockets[client_id]
+        if forwarder is not None:
+            forwarder.cancel()
+        if pubsub is not None:
+            await pubsub.unsubscribe(channel_name(client_id))
+            await pubsub.aclose()
 
 async def run_scan(client_id: str, scan_request: ScanRequest):
-    """Run the scan command and stream output to the client"""
+    """Run the scan in-process and stream its events to the client"""
+    # Check if we have an active WebSocket connection (with Redis it may live in another worker)
+    send = event_sender(client_id)
+    if send is None:
+        logger.error("No active WebSocket connection for client %s", client_id)
+        return
+    
+    # Track the running scan so it can be cancelled on shutdown
+    scans[client_id] = asyncio.current_task()
+    
     try:
-        # Generate command arguments
-        cmd = get_command_args(scan_request)
-        
-        # Check if we have an active WebSocket connection
-        if client_id not in active_websockets:
-            logger.error(f"No active WebSocket connection for client {client_id}")
-            return
-        
-        websocket = active_websockets[client_id]
-        
-        # Send initial messages to the client
-        try:
-            await websocket.send_json({"type": "info", "data": f"Starting scan for {scan_request.url}..."})
-            await websocket.send_json({"type": "info", "data": f"Running command: {sys.executable} {' '.join(cmd[1:])}"})  
-            logger.info(f"Sent initial messages to client {client_id}")
-        except Exception as e:
-            logger.error(f"Error sending initial messages: {str(e)}")
-            return
-        
-        # Log the working directory
-        logger.info(f"Working directory: {parent_dir}")
-        
-        # Check if main script exists
-        main_script = os.path.join(parent_dir, "main.py")
-        if not os.path.exists(main_script):
-            logger.error(f"main.py not found at {main_script}")
-            await websocket.send_json({"type": "error", "data": f"Error: main.py not found at {main_script}"})
-            return
-            
-        logger.info(f"Found main.py at {main_script}")
-        
-        # Create a subprocess with pipes for stdout and stderr
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=parent_dir
-            )
-            logger.info(f"Process started with PID: {process.pid}")
-            
-            try:
-                await websocket.send_json({"type": "info", "data": f"Process started with PID: {process.pid}"})
-            except Exception as e:
-                logger.error(f"Error sending process start message: {str(e)}")
-        except Exception as e:
-            logger.error(f"Failed to start process: {str(e)}")
-            await websocket.send_json({"type": "error", "data": f"Failed to start process: {str(e)}"})
-            return
-        
-        # Store the process
-        processes[client_id] = process
-        
-        # Read from stdout and stderr concurrently
-        async def read_stream(stream, prefix=""):
-            logger.info(f"Started reading from stream (prefix: {prefix})")
-            try:
-                while True:
-                    # Read one line at a time
-                    line = await stream.readline()
-                    if not line:
-                        logger.info(f"End of stream (prefix: {prefix})")
-                        break
-                    
-                    try:
-                        line_str = line.decode("utf-8", errors="replace").rstrip()
-                        logger.info(f"Read line: {line_str}")
-                        
-                        if client_id in active_websockets:
-                            try:
-                                logger.info(f"Sending to client {client_id}: {prefix}{line_str}")
-                                await active_websockets[client_id].send_json({"type": "output", "data": f"{prefix}{line_str}"})
-                                logger.info(f"Sent to client: {prefix}{line_str}")
-                            except Exception as send_err:
-                                logger.error(f"Error sending to client: {str(send_err)}")
-                    except Exception as e:
-                        logger.error(f"Error processing line: {str(e)}")
-            except Exception as e:
-                logger.error(f"Error in read_stream: {str(e)}")
-                if client_id in active_websockets:
-                    try:
-                        await active_websockets[client_id].send_json({"type": "error", "data": f"{prefix}Error reading output: {str(e)}"})
-                    except Exception:
-                        logger.error("Could not send error message")
-        
-        # Create tasks to read from stdout and stderr
-        stdout_task = asyncio.create_task(read_stream(process.stdout))
-        stderr_task = asyncio.create_task(read_stream(process.stderr, "ERROR: "))
-        
-        # Wait for the process to complete
-        try:
-            exit_code = await process.wait()
-            logger.info(f"Process exited with code {exit_code}")
-        except Exception as e:
-            logger.error(f"Error waiting for process: {str(e)}")
-            if client_id in active_websockets:
-                try:
-                    await active_websockets[client_id].send_json({"type": "error", "data": f"Error waiting for process: {str(e)}"})
-                except Exception:
-                    logger.error("Could not send error message")
-        
-        # Wait for stdout and stderr to be fully read
-        await asyncio.gather(stdout_task, stderr_task)
-        
-        # Send completion message
-        if client_id in active_websockets:
-            try:
-                await active_websockets[client_id].send_json({"type": "status", "data": "Complete"})
-                if exit_code == 0:
-                    await active_websockets[client_id].send_json({"type": "info", "data": "Scan completed successfully"})
-                else:
-                    await active_websockets[client_id].send_json({"type": "info", "data": f"Scan failed with exit code: {exit_code}"})
-            except Exception as e:
-                logger.error(f"Error sending completion message: {str(e)}")
-        
-        # Clean up
-        if client_id in processes:
-            del processes[client_id]
-        
+        if scan_slots.locked():
+            await send({"type": "info", "data": "Waiting for a running scan to finish..."})
+        async with scan_slots:
+            await stream_scan(send, scan_request)
+        logger.info("Scan finished for client %s", client_id)
     except Exception as e:
-        logger.error(f"Error running scan: {str(e)}")
-        if client_id in active_websockets:
-            try:
-                await active_websockets[client_id].send_json({"type": "error", "data": f"Error running scan: {str(e)}"})
-            except Exception:
-                logger.error("Could not send error message")
+        logger.error("Error running scan: %s", e)
+        # The client may be gone already, in which case there is no one to tell
+        with contextlib.suppress(Exception):
+            await send({"type": "error", "data": f"Error running scan: {str(e)}"})
+    finally:
+        # Clean up
+        scans.pop(client_id, None)
+
+async def stream_scan(send: Callable[[Dict[str, Any]], Awaitable[None]], scan_request: ScanRequest):
+    """Run one scan and send each of its events"""
+    # The scan buffers its own output while we send, so lines that pile up
+    # meanwhile arrive here already batched into a single event
+    events = run_scan_api(
+        url=scan_request.url,
+        types=scan_request.types,
+        headers=[(header.name, header.value) for header in scan_request.headers],
+        timeout=scan_request.timeout,
+        exit_first=scan_request.exit_first,
+        verbose=scan_request.verbose,
+        h2_payload_placement=scan_request.h2_payload_placement,
+        output_batch_size=OUTPUT_BATCH_SIZE,
+    )
+    # aclosing() stops the scan right away if sending fails (client gone)
+    async with contextlib.aclosing(events):
+        async for event in events:
+            await send(event)
+
+def load_asset(name: str, media_type: str) -> Dict[str, Any]:
+    """Read a frontend file once and precompute its cache headers"""
+    path = Path(__file__).with_name(name)
+    content = path.read_bytes()
+    return {
+        "content": content,
+        "media_type": media_type,
+        "headers": {
+            "Cache-Control": "public, max-age=3600",
+            "ETag": f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"',
+            "Last-Modified": datetime.datetime.fromtimestamp(
+                path.stat().st_mtime, datetime.timezone.utc
+            ).strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        },
+    }
+
+def serve_asset(request: Request, asset: Dict[str, Any]) -> Response:
+    """Serve a cached asset, answering 304 when the client already has it"""
+    if request.headers.get("if-none-match") == asset["headers"]["ETag"]:
+        return Response(status_code=304, headers=asset["headers"])
+    return Response(content=asset["content"], media_type=asset["media_type"], headers=asset["headers"])
+
+# Static frontend files, loaded once at startup
+INDEX_ASSET = load_asset("index.html", "text/html")
+CSS_ASSET = load_asset("style.css", "text/css")
+JS_ASSET = load_asset("script.js", "application/javascript")
 
 # ------------------- Routes -------------------
 
 @app.get("/", response_class=HTMLResponse)
-async def get_index():
+async def get_index(request: Request):
     """Serve the index.html file"""
-    return FileResponse(os.path.join(os.path.dirname(__file__), "index.html"))
+    return serve_asset(request, INDEX_ASSET)
 
 @app.get("/style.css")
-async def get_css():
+async def get_css(request: Request):
     """Serve the style.css file"""
-    return FileResponse(os.path.join(os.path.dirname(__file__), "style.css"))
+    return serve_asset(request, CSS_ASSET)
 
 @app.get("/script.js")
-async def get_js():
+async def get_js(request: Request):
     """Serve the script.js file"""
-    return FileResponse(os.path.join(os.path.dirname(__file__), "script.js"))
+    return serve_asset(request, JS_ASSET)
 
 @app.post("/scan")
 async def start_scan(scan_request: ScanRequest, background_tasks: BackgroundTasks):
     """Start a scan with the provided configuration"""
     try:
-        # Get or generate a client ID
-        client_id = getattr(scan_request, 'client_id', None)
-        if not client_id:
-            # Generate a unique client ID if none was provided
-            client_id = str(uuid.uuid4())
-            
-        logger.info(f"Using client ID: {client_id}")
+        # Get or generate a unique client ID
+        client_id = scan_request.client_id or secrets.token_urlsafe(16)
+        
+        logger.info("Using client ID: %s", client_id)
         
         # Add the scan task to the background tasks
         background_tasks.add_task(run_scan, client_id, scan_request)
@@ -315,7 +316,7 @@ async def start_scan(scan_request: ScanRequest, background_tasks: BackgroundTask
         # Return the client ID
         return {"status": "success", "client_id": client_id}
     except Exception as e:
-        logger.error(f"Error starting scan: {str(e)}")
+        logger.error("Error starting scan: %s", e)
         return {"status": "error", "error": str(e)}
 
 # ------------------- Main -------------------
@@ -323,12 +324,9 @@ async def start_scan(scan_request: ScanRequest, background_tasks: BackgroundTask
 def signal_handler(sig, frame):
     """Handle SIGINT and SIGTERM to terminate gracefully"""
     print("Shutting down...")
-    # Terminate all running processes
-    for process in processes.values():
-        try:
-            process.terminate()
-        except:
-            pass
+    # Cancel all running scans
+    for task in scans.values():
+        task.cancel()
     sys.exit(0)
 
 if __name__ == "__main__":
@@ -336,21 +334,41 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="HTTP Request Smuggling Detector Web Frontend")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes (requires --redis-url when greater than 1)")
+    parser.add_argument("--redis-url", default=REDIS_URL,
+                        help="Redis URL used to route scan output between workers (env: HRS_REDIS_URL)")
     args = parser.parse_args()
     
+    if args.workers > 1 and not args.redis_url:
+        print("Error: --workers greater than 1 requires --redis-url so scan output can reach any worker.")
+        sys.exit(1)
+    
+    # Worker processes re-import this module and read the URL from the environment
+    if args.redis_url:
+        os.environ["HRS_REDIS_URL"] = args.redis_url
+    
     # Register signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Check if main.py exists
-    main_script = os.path.join(parent_dir, "main.py")
-    if not os.path.exists(main_script):
-        print(f"Error: {main_script} not found. Please make sure the frontend directory is in the root of the hrs_finder project.")
-        sys.exit(1)
-    
     # Run the server
     print(f"Starting HTTP Request Smuggling Detector Web Frontend on {args.host}:{args.port}")
     print(f"Open your browser and navigate to http://{args.host}:{args.port}/")
     print("Press Ctrl+C to quit")
     
-    uvicorn.run(app, host=args.host, port=args.port)
+    # Multiple workers require an import string so each process can load the app
+    app_target = f"{Path(__file__).stem}:app" if args.workers > 1 else app
+    
+    uvicorn.run(
+        app_target,
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        loop=LOOP_IMPL,
+        http=HTTP_IMPL,
+        ws="websockets",
+        # Keep idle connections alive with protocol-level pings
+        ws_ping_interval=20.0,
+        ws_ping_timeout=20.0,
+    )
@@ -20,7 +20,6 @@ setup(
     },
     include_package_data=True,
     install_requires=[
-        "click>=8.0.0",
         "colorama>=0.4.4",
         "rich>=10.0.0",
         "h2>=4.0.0",
@@ -5,51 +5,129 @@ This module provides the command-line interface for the tool,
 allowing users to run scans and tests against target servers.
 """
 
+import argparse
 import asyncio
+import contextlib
+import contextvars
+import functools
+import importlib
 import json
+import mmap
 import os
+import re
 import sys
-import urllib.parse
-from typing import List, Optional, Tuple, Dict, Any
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
-import click
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-from src.clients.http1 import HTTP1Client
-from src.utils.logging import setup_logging, get_logger
-from src.detectors import cl_te_detector, te_cl_detector, h2_te_detector, h2_cl_detector
+from src import __version__
+from src.clients.base import close_pooled_connections
+from src.utils.logging import ScanVerbosityFilter, get_logger, scan_verbose, setup_logging
 import logging
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
 
+# Application logger; setup_logging configures this same instance in place
+logger = get_logger()
 
-@click.group()
-@click.version_option()
-@click.option('--debug', is_flag=True, help='Enable debug logging')
-@click.option('--log-file', help='Log file path')
-def cli(debug: bool, log_file: Optional[str]):
-    """HTTP Request Smuggling Detection Tool.
+# Map of vulnerability types to (module, function) of their detectors.
+# Detector modules are only imported once a scan actually selects them.
+DETECTOR_MAP = {
+    'cl.te': ('src.detectors.cl_te_detector', 'test_cl_te'),
+    'te.cl': ('src.detectors.te_cl_detector', 'test_te_cl'),
+    'h2.te': ('src.detectors.h2_te_detector', 'test_h2_te'),
+    'h2.cl': ('src.detectors.h2_cl_detector', 'test_h2_cl'),
+    # Add more detector types here as they are implemented
+}
+
+# All available vulnerability types, in the order they run by default
+DETECTOR_TYPES = tuple(DETECTOR_MAP)
+
+# "Name: Value" header option, split at the first colon with surrounding whitespace trimmed
+_HEADER_RE = re.compile(r'\s*([^:]*?)\s*:\s*(.*?)\s*', re.DOTALL)
+
+# scheme://host[:port][/path][?query][#fragment]
+_URL_RE = re.compile(
+    r'([A-Za-z][A-Za-z0-9+.-]*)://(\[[^\]]*\]|[^:/?#]*)(?::([^/?#]*))?([^?#]*)(?:\?([^#]*))?(?:#.*)?',
+    re.DOTALL,
+)
+
+# Default port for each supported URL scheme
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Separators between vulnerability types in --type (commas and/or whitespace)
+_TYPE_SPLIT_RE = re.compile(r'[,\s]+')
+
+# Detectors that accept an HTTP/2 payload placement
+H2_TYPES = frozenset({'h2.te', 'h2.cl'})
+
+
+@functools.lru_cache(maxsize=None)
+def _console() -> "Console":
+    """Return the shared Rich console, creating it on first use.
     
-    A Python toolkit for detecting HTTP request smuggling vulnerabilities.
+    Deferring this keeps ``--help`` and argument errors from importing and
+    constructing Rich at all.
     """
-    # Set up logging
-    log_level = 10 if debug else 20  # DEBUG=10, INFO=20
-    setup_logging(level=log_level, log_file=log_file, verbose=debug)
-
-
-@cli.command()
-@click.argument('url')
-@click.option('--method', '-m', default='GET', help='HTTP method to use')
-@click.option('--header', '-H', multiple=True, help='HTTP header (can be used multiple times)')
-@click.option('--data', '-d', help='HTTP request body')
-@click.option('--raw', '-r', help='Path to file containing raw HTTP request')
-@click.option('--keep-alive', is_flag=True, help='Keep connection alive after request')
-@click.option('--timeout', '-t', default=15.0, help='Read timeout in seconds')
-@click.option('--connect-timeout', '-c', default=5.0, help='Connection timeout in seconds')
-@click.option('--output', '-o', help='Output file for response')
-@click.option('--verbose', '-v', is_flag=True, help='Verbose output')
-@click.option('--verify-ssl', is_flag=True, help='Verify SSL certificates')
+    from rich.console import Console
+    return Console()
+
+
+def _run(coro: Any) -> Any:
+    """Run a coroutine to completion on a fresh event loop.
+    
+    Uses uvloop's libuv-based loop when it is installed, which makes the
+    many short connections a scan opens noticeably cheaper.
+    """
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        try:
+            return runner.run(coro)
+        finally:
+            # Idle keep-alive connections are bound to this loop
+            runner.run(close_pooled_connections())
+
+
+def _load_detector(vuln_type: str) -> Callable[..., Any]:
+    """Import the detector module for a vulnerability type and return its test function."""
+    module_name, func_name = DETECTOR_MAP[vuln_type]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _parse_headers(raw_headers: Sequence[str]) -> Tuple[List[Tuple[str, str]], FrozenSet[str], List[str]]:
+    """Parse "Name: Value" header options in a single pass.
+    
+    Args:
+        raw_headers: Header strings as given on the command line
+        
+    Returns:
+        Tuple of (headers, lowercased header names, invalid header strings)
+    """
+    headers = []
+    invalid = []
+    match = _HEADER_RE.fullmatch
+    for header_str in raw_headers:
+        m = match(header_str)
+        if m:
+            headers.append(m.groups())
+        else:
+            invalid.append(header_str)
+    return headers, frozenset(name.lower() for name, _ in headers), invalid
+
+
+def _split_types(types: str) -> List[str]:
+    """Split a --type value into lowercase vulnerability type names."""
+    return [t for t in _TYPE_SPLIT_RE.split(types.lower()) if t]
+
+
 def request(
     url: str,
     method: str,
@@ -67,49 +145,41 @@ def request(
     
     URL should be in the format http(s)://hostname[:port]/path
     """
-    logger = get_logger()
-    
     # Parse URL
-    try:
-        parsed_url = urllib.parse.urlparse(url)
-        scheme = parsed_url.scheme.lower()
-        if scheme not in ('http', 'https'):
-            console.print(f"[bold red]Error:[/] Invalid URL scheme: {scheme}. Must be http or https.")
-            sys.exit(1)
-            
-        host = parsed_url.netloc
-        path = parsed_url.path or '/'
-        
-        if ':' in host:
-            host, port_str = host.rsplit(':', 1)
-            try:
-                port = int(port_str)
-            except ValueError:
-                console.print(f"[bold red]Error:[/] Invalid port: {port_str}")
-                sys.exit(1)
-        else:
-            port = 443 if scheme == 'https' else 80
-            
-        use_tls = scheme == 'https'
-    except Exception as e:
-        console.print(f"[bold red]Error parsing URL:[/] {e}")
+    url_match = _URL_RE.fullmatch(url)
+    if not url_match:
+        _console().print(f"[bold red]Error parsing URL:[/] {url}")
         sys.exit(1)
-        
+    scheme, host, port_str, path, query = url_match.groups()
+    
+    scheme = scheme.lower()
+    if scheme not in _DEFAULT_PORTS:
+        _console().print(f"[bold red]Error:[/] Invalid URL scheme: {scheme}. Must be http or https.")
+        sys.exit(1)
+    
+    if port_str:
+        try:
+            port = int(port_str)
+        except ValueError:
+            _console().print(f"[bold red]Error:[/] Invalid port: {port_str}")
+            sys.exit(1)
+    else:
+        port = _DEFAULT_PORTS[scheme]
+    
+    use_tls = scheme == 'https'
+    path = path or '/'
+    
     # Add query string to path if present
-    if parsed_url.query:
-        path = f"{path}?{parsed_url.query}"
+    if query:
+        path = f"{path}?{query}"
     
     # Parse headers
-    headers = []
-    for h in header:
-        if ':' in h:
-            name, value = h.split(':', 1)
-            headers.append((name.strip(), value.strip()))
-        else:
-            console.print(f"[bold yellow]Warning:[/] Ignoring invalid header format: {h}")
+    headers, header_names, invalid_headers = _parse_headers(header)
+    for h in invalid_headers:
+        _console().print(f"[bold yellow]Warning:[/] Ignoring invalid header format: {h}")
     
     # Add Host header if not present
-    if not any(name.lower() == 'Host' for name, _ in headers):
+    if 'host' not in header_names:
         headers.append(('Host', host))
     
     # Convert data to bytes
@@ -117,19 +187,25 @@ def request(
     if data:
         body_bytes = data.encode('utf-8')
     
-    # Read raw request if specified
+    # Map the raw request file if specified, so it is sent without copying it
     raw_request = None
+    raw_map = None
     if raw:
         try:
             with open(raw, 'rb') as f:
-                raw_request = f.read()
+                # An empty file cannot be mapped
+                if os.fstat(f.fileno()).st_size:
+                    raw_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    raw_request = memoryview(raw_map)
+                else:
+                    raw_request = b''
         except Exception as e:
-            console.print(f"[bold red]Error reading raw request file:[/] {e}")
+            _console().print(f"[bold red]Error reading raw request file:[/] {e}")
             sys.exit(1)
     
     # Run the request
     try:
-        asyncio.run(
+        _run(
             _run_request(
                 host, port, use_tls, method, path, headers, body_bytes,
                 raw_request, keep_alive, timeout, connect_timeout,
@@ -137,12 +213,54 @@ def request(
             )
         )
     except KeyboardInterrupt:
-        console.print("\n[bold yellow]Request cancelled by user[/]")
+        _console().print("\n[bold yellow]Request cancelled by user[/]")
         sys.exit(130)
     except Exception as e:
-        console.print(f"[bold red]Error:[/] {e}")
+        _console().print(f"[bold red]Error:[/] {e}")
         logger.exception("Unhandled exception")
         sys.exit(1)
+    finally:
+        if raw_map is not None:
+            raw_request.release()
+            # A view still held elsewhere keeps the map open until it is collected
+            with contextlib.suppress(BufferError):
+                raw_map.close()
+
+
+class _NullProgress:
+    """Do-nothing stand-in for a Rich Progress when output is not a terminal."""
+    
+    def __enter__(self) -> "_NullProgress":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+    
+    def add_task(self, *args: Any, **kwargs: Any) -> None:
+        return None
+    
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        pass
+    
+    def stop(self) -> None:
+        pass
+
+
+def _progress() -> Any:
+    """Return a spinner for interactive terminals, or a no-op when piped.
+    
+    Skipping the spinner off-terminal avoids Rich's refresh thread and its
+    terminal writes in CI and shell pipelines.
+    """
+    if not _console().is_terminal:
+        return _NullProgress()
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]{task.description}"),
+        console=_console(),
+        transient=True,
+    )
 
 
 async def _run_request(
@@ -162,14 +280,9 @@ async def _run_request(
     verify_ssl: bool,
 ):
     """Run an HTTP request using the HTTP1Client."""
-    logger = get_logger()
+    from src.clients.http1 import HTTP1Client
     
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[bold blue]{task.description}"),
-        console=console,
-        transient=True,
-    ) as progress:
+    with _progress() as progress:
         task = progress.add_task("Connecting...", total=None)
         
         client = HTTP1Client(
@@ -187,10 +300,10 @@ async def _run_request(
             
             progress.update(task, description="Sending request...")
             
-            start_message = f"Sending {method} request to {path}"
             if raw_request:
-                start_message = "Sending raw request"
-            logger.info(start_message)
+                logger.info("Sending raw request")
+            else:
+                logger.info("Sending %s request to %s", method, path)
             
             response_info, response_body = await client.send_request(
                 method=method,
@@ -205,60 +318,36 @@ async def _run_request(
             progress.stop()
     
     # Print response info
-    console.print(f"[bold green]Status:[/] {response_info['status_code']} {response_info.get('status_message', '')}")
-    console.print(f"[bold green]Response time:[/] {response_info.get('response_time', 0):.6f} seconds")
+    _console().print(f"[bold green]Status:[/] {response_info['status_code']} {response_info.get('status_message', '')}")
+    _console().print(f"[bold green]Response time:[/] {response_info.get('response_time', 0):.6f} seconds")
     
     if verbose:
-        console.print("\n[bold green]Response headers:[/]")
+        _console().print("\n[bold green]Response headers:[/]")
         for name, value in response_info.get('headers', []):
-            console.print(f"  [blue]{name}:[/] {value}")
+            _console().print(f"  [blue]{name}:[/] {value}")
     
-    # Print response body
-    try:
-        body_text = response_body.decode('utf-8', errors='replace')
-        if verbose:
-            console.print("\n[bold green]Response body:[/]")
-            if len(body_text) > 4096:
-                console.print(body_text[:4096])
-                console.print("[dim]... (truncated)[/]")
-            else:
-                console.print(body_text)
-        else:
-            console.print(f"\n[bold green]Response body:[/] {len(response_body)} bytes")
-    except Exception:
-        if verbose:
-            console.print("\n[bold green]Response body:[/] [dim](binary data)[/]")
-            console.print(response_body[:100].hex())
-            if len(response_body) > 100:
-                console.print("[dim]... (truncated)[/]")
-        else:
-            console.print(f"\n[bold green]Response body:[/] {len(response_body)} bytes (binary)")
+    # Print response body, decoding only the part that is shown
+    if verbose:
+        _console().print("\n[bold green]Response body:[/]")
+        _console().print(response_body[:4096].decode('utf-8', errors='replace'))
+        if len(response_body) > 4096:
+            _console().print("[dim]... (truncated)[/]")
+    else:
+        _console().print(f"\n[bold green]Response body:[/] {len(response_body)} bytes")
     
     # Save response to file if requested
     if output:
         try:
             with open(output, 'wb') as f:
                 f.write(response_body)
-            console.print(f"[bold green]Response saved to:[/] {output}")
+            _console().print(f"[bold green]Response saved to:[/] {output}")
         except Exception as e:
-            console.print(f"[bold red]Error saving response to file:[/] {e}")
+            _console().print(f"[bold red]Error saving response to file:[/] {e}")
             
     # Close the connection
     await client.close()
 
 
-@cli.command()
-@click.argument('url_arg', required=False)
-@click.option('-u', '--url', help='Target URL to scan (http(s)://hostname[:port])')
-@click.option('-t', '--type', help='Comma-separated vulnerability types to test (e.g., "cl.te,te.cl")')
-@click.option('-o', '--output', help='Output file for results (JSON)')
-@click.option('-v', '--verbose', is_flag=True, help='Verbose output')
-@click.option('--verify-ssl', is_flag=True, help='Verify SSL certificates')
-@click.option('--timeout', default=5.0, help='Request timeout in seconds')
-@click.option('-e', '--exit-first', is_flag=True, help='Stop after finding the first vulnerability')
-@click.option('-H', '--header', multiple=True, help='Custom header to include in requests (format: "Name: Value")')
-@click.option('-f', '--file', help='Path to file containing Transfer-Encoding header variations')
-@click.option('--h2-payload-placement', type=click.Choice(['normal_header', 'custom_header_value', 'custom_header_name', 'request_line']), help='Where to place the HTTP/2 payload (normal_header, custom_header_value, custom_header_name, request_line)')
 def scan(
     url_arg: Optional[str],
     url: Optional[str],
@@ -281,158 +370,539 @@ def scan(
     
     # Check if URL is provided
     if not target_url:
-        console.print("[bold red]Error:[/bold red] URL is required. Provide it as an argument or with --url/-u option.")
-        console.print("Example: hrs_finder scan https://example.com")
-        console.print("         hrs_finder scan --url https://example.com")
+        _console().print("[bold red]Error:[/bold red] URL is required. Provide it as an argument or with --url/-u option.")
+        _console().print("Example: hrs_finder scan https://example.com")
+        _console().print("         hrs_finder scan --url https://example.com")
         sys.exit(1)
     
     # Configure logging based on verbose flag
-    logger = get_logger()
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logger.setLevel(log_level)
-    
-    # Configure handlers to respect verbose flag
-    for handler in logger.handlers:
-        if isinstance(handler, logging.StreamHandler):
-            handler.setLevel(log_level)
+    _configure_verbosity(verbose)
     
     # Process custom headers
-    custom_headers = []
-    for header_str in header:
-        try:
-            name, value = header_str.split(':', 1)
-            custom_headers.append((name.strip(), value.strip()))
-        except ValueError:
-            console.print(f"[bold red]Error:[/bold red] Invalid header format: {header_str}")
-            console.print("Headers should be in the format 'Name: Value'")
-            sys.exit(1)
+    custom_headers, _, invalid_headers = _parse_headers(header)
+    if invalid_headers:
+        _console().print(f"[bold red]Error:[/bold red] Invalid header format: {invalid_headers[0]}")
+        _console().print("Headers should be in the format 'Name: Value'")
+        sys.exit(1)
     
     # Process vulnerability types
     vulnerability_types = []
     if type:
         # Debug the raw input
         if verbose:
-            console.print(f"[blue]Debug:[/blue] Raw type input: '{type}'")
+            _console().print(f"[blue]Debug:[/blue] Raw type input: '{type}'")
             
-        # Split by comma, strip whitespace, and convert to lowercase
+        # Split on commas and whitespace and convert to lowercase
         # This properly handles cases like "te.cl, cl.te" with spaces after commas
-        vulnerability_types = [t.strip().lower() for t in type.split(',') if t.strip()]
+        vulnerability_types = _split_types(type)
         
         # Debug output to help diagnose issues
         if verbose:
-            console.print(f"[blue]Debug:[/blue] Parsed vulnerability types: {vulnerability_types}")
-    
-    # Map of vulnerability types to detector functions
-    detector_map = {
-        'cl.te': cl_te_detector.test_cl_te,
-        'te.cl': te_cl_detector.test_te_cl,
-        'h2.te': h2_te_detector.test_h2_te,
-        'h2.cl': h2_cl_detector.test_h2_cl,
-        # Add more detector types here as they are implemented
-    }
+            _console().print(f"[blue]Debug:[/blue] Parsed vulnerability types: {vulnerability_types}")
+    
+    vulnerability_types = _select_vulnerability_types(vulnerability_types)
+    if not vulnerability_types:
+        sys.exit(1)
+
+    # Run the selected detectors, all on the same event loop
+    results = _run(
+        _run_detectors(
+            target_url, vulnerability_types, custom_headers, timeout,
+            exit_first, verbose, h2_payload_placement
+        )
+    )
+    
+    # Output results to file if requested
+    if output:
+        try:
+            if orjson is not None:
+                with open(output, 'wb') as f:
+                    f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+            else:
+                with open(output, 'w') as f:
+                    json.dump(results, f, indent=2)
+            _console().print(f"\n[bold green]Results saved to {output}[/]")
+        except Exception as e:
+            _console().print(f"[bold red]Error saving results to {output}:[/] {e}")
     
+    _print_summary(results)
+
+
+def _configure_verbosity(verbose: bool) -> None:
+    """Set the application logger and its stream handlers to match the verbose flag."""
+    log_level = logging.DEBUG if verbose else logging.INFO
+    logger.setLevel(log_level)
+    
+    # Configure handlers to respect verbose flag
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setLevel(log_level)
+
+
+def _select_vulnerability_types(vulnerability_types: List[str]) -> List[str]:
+    """Validate the requested vulnerability types against the available detectors.
+    
+    Args:
+        vulnerability_types: Normalized (lowercase) type names; empty means all
+        
+    Returns:
+        The runnable types, or an empty list if none of the requested types are valid
+    """
     # If no types specified, run all available detectors
     if not vulnerability_types:
-        vulnerability_types = list(detector_map.keys())
+        return list(DETECTOR_TYPES)
     
     # Validate vulnerability types
-    invalid_types = [t for t in vulnerability_types if t not in detector_map]
+    invalid_types = [t for t in vulnerability_types if t not in DETECTOR_MAP]
     if invalid_types:
-        console.print(f"[bold yellow]Warning:[/bold yellow] Unknown vulnerability type(s): {', '.join(invalid_types)}")
-        console.print(f"Available types: {', '.join(detector_map.keys())}")
+        _console().print(f"[bold yellow]Warning:[/bold yellow] Unknown vulnerability type(s): {', '.join(invalid_types)}")
+        _console().print(f"Available types: {', '.join(DETECTOR_TYPES)}")
         
         # Filter out invalid types
-        vulnerability_types = [t for t in vulnerability_types if t in detector_map]
+        vulnerability_types = [t for t in vulnerability_types if t in DETECTOR_MAP]
         if not vulnerability_types:
-            console.print("[bold red]Error:[/bold red] No valid vulnerability types specified")
-            sys.exit(1)
+            _console().print("[bold red]Error:[/bold red] No valid vulnerability types specified")
+    
+    return vulnerability_types
+
 
-    # Run the selected detectors
+async def _run_detectors(
+    target_url: str,
+    vulnerability_types: List[str],
+    custom_headers: List[Tuple[str, str]],
+    timeout: float,
+    exit_first: bool,
+    verbose: bool,
+    h2_payload_placement: Optional[str],
+) -> Dict[str, Any]:
+    """Run the selected detectors concurrently against the target and print their findings.
+    
+    Detectors are network-bound, so the HTTP/2 detectors run side by side
+    with the HTTP/1.1 ones. The HTTP/1.1 detectors take turns in the order
+    they were requested: a TE.CL probe can leave a stray byte on the
+    target's back-end connection that would land in a CL.TE probe, and both
+    redraw the same progress line. Findings are reported in the order the
+    types were requested. With
+    exit_first, the detectors still running are cancelled as soon as any
+    detector reports a vulnerability.
+    
+    Returns:
+        Mapping of vulnerability type to its findings, or an "Error: ..." string
+    """
     results = {}
-    for vuln_type in vulnerability_types:
-        console.print(f"\n[bold cyan]Running {vuln_type.upper()} detection...[/]")
-        detector_func = detector_map[vuln_type]
-        
-        # Run the detector asynchronously
-        try:
-            loop = asyncio.get_event_loop()
-            
-            # Prepare common arguments for all detectors
-            detector_args = {
-                'url': target_url,
-                'verbose': verbose,
-                'timeout': timeout,
-                'exit_first': exit_first,
-                'custom_headers': custom_headers,
-            }
-            
-            # Add h2_payload_placement only for HTTP/2 detectors
-            if vuln_type.startswith('h2.') and h2_payload_placement:
-                detector_args['payload_placement'] = h2_payload_placement
+    
+    # Common arguments for all detectors, built once per scan
+    common_args = {
+        'url': target_url,
+        'verbose': verbose,
+        'timeout': timeout,
+        'exit_first': exit_first,
+        'custom_headers': custom_headers,
+    }
+    h2_args = dict(common_args, payload_placement=h2_payload_placement) if h2_payload_placement else common_args
+    
+    async def _run_one(vuln_type: str) -> List[Dict[str, Any]]:
+        detector_func = _load_detector(vuln_type)
+        # Add h2_payload_placement only for HTTP/2 detectors
+        detector_args = h2_args if vuln_type in H2_TYPES else common_args
+        return await detector_func(**detector_args)
+    
+    tasks = {}
+    
+    def _start(vuln_type: str) -> "asyncio.Task":
+        _console().print(f"\n[bold cyan]Running {vuln_type.upper()} detection...[/]")
+        task = tasks[vuln_type] = asyncio.create_task(_run_one(vuln_type))
+        return task
+    
+    order = list(dict.fromkeys(vulnerability_types))
+    h1_types = [vuln_type for vuln_type in order if vuln_type not in H2_TYPES]
+    for vuln_type in order:
+        if vuln_type in H2_TYPES or vuln_type == h1_types[0]:
+            _start(vuln_type)
+    # The remaining HTTP/1.1 detectors start one at a time as the previous one ends
+    h1_waiting = h1_types[1:]
+    
+    # Report each detector as soon as it and all detectors before it are done
+    reported = 0
+    
+    pending = set(tasks.values())
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
             
-            result = loop.run_until_complete(detector_func(**detector_args))
+            # Stop after finding the first vulnerability if exit_first is True
+            if exit_first and any(not task.cancelled() and task.exception() is None and task.result() for task in done):
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                pending = set()
+                # HTTP/1.1 detectors that never started are not reported
+                h1_waiting.clear()
+                order = [vuln_type for vuln_type in order if vuln_type in tasks]
+            elif h1_waiting and any(vuln_type not in H2_TYPES for vuln_type, task in tasks.items() if task in done):
+                pending.add(_start(h1_waiting.pop(0)))
             
-            if result:
-                console.print(f"[bold green]Found {len(result)} {vuln_type.upper()} vulnerabilities![/]")
-                
-                # Print detailed vulnerability information
-                for i, finding in enumerate(result):
-                    console.print(f"\n[bold cyan]Finding #{i+1}:[/]")
-                    
-                    # Display basic finding information
-                    console.print(f"  [bold]Type:[/] {vuln_type.upper()}")
-                    
-                    # Display mutation description and placement details if available
-                    if 'mutation_description' in finding:
-                        console.print(f"  [bold]Mutation:[/] {finding['mutation_description']}")
-                    
-                    if 'header_name' in finding and 'header_value' in finding:
-                        console.print(f"  [bold]Header:[/] {finding['header_name']}: {finding['header_value']}")
-                    
-                    if 'placement_type' in finding:
-                        console.print(f"  [bold]Placement:[/] {finding['placement_type']}")
-                    
-                    # Display detection details
-                    if 'ratio' in finding:
-                        console.print(f"  [bold]Time Ratio:[/] {finding['ratio']:.2f}x")
-                    
-                    if 'response_time' in finding and 'baseline_time' in finding:
-                        console.print(f"  [bold]Response Time:[/] {finding['response_time']:.3f}s (baseline: {finding['baseline_time']:.3f}s)")
-                    
-                    if 'reason' in finding:
-                        console.print(f"  [bold]Reason:[/] {finding['reason']}")
-                
-                results[vuln_type] = result
-                
-                # Stop after finding the first vulnerability if exit_first is True
-                if exit_first:
-                    break
-            else:
-                console.print(f"[green]No {vuln_type.upper()} vulnerabilities detected.[/]")
-                results[vuln_type] = []
-                
-        except Exception as e:
-            console.print(f"[bold red]Error running {vuln_type.upper()} detector:[/] {str(e)}")
-            results[vuln_type] = f"Error: {str(e)}"
+            while reported < len(order) and order[reported] in tasks and tasks[order[reported]].done():
+                vuln_type = order[reported]
+                task = tasks[vuln_type]
+                reported += 1
+                if not task.cancelled():
+                    _report_detector_result(vuln_type, task, results)
+    finally:
+        for task in pending:
+            task.cancel()
     
-    # Output results to file if requested
-    if output:
-        try:
-            with open(output, 'w') as f:
-                json.dump(results, f, indent=2)
-            console.print(f"\n[bold green]Results saved to {output}[/]")
-        except Exception as e:
-            console.print(f"[bold red]Error saving results to {output}:[/] {e}")
+    return results
+
+
+def _report_detector_result(vuln_type: str, task: "asyncio.Task", results: Dict[str, Any]) -> None:
+    """Print the outcome of a finished detector task and record it in results."""
+    error = task.exception()
+    if error is not None:
+        _console().print(f"[bold red]Error running {vuln_type.upper()} detector:[/] {error}")
+        results[vuln_type] = f"Error: {error}"
+        return
+    
+    result = task.result()
+    if not result:
+        _console().print(f"[green]No {vuln_type.upper()} vulnerabilities detected.[/]")
+        results[vuln_type] = []
+        return
+    
+    _console().print(f"[bold green]Found {len(result)} {vuln_type.upper()} vulnerabilities![/]")
+    
+    # Print detailed vulnerability information
+    for i, finding in enumerate(result):
+        _console().print(f"\n[bold cyan]Finding #{i+1}:[/]")
+        
+        # Display basic finding information
+        _console().print(f"  [bold]Type:[/] {vuln_type.upper()}")
+        
+        # Display mutation description and placement details if available
+        if 'mutation_description' in finding:
+            _console().print(f"  [bold]Mutation:[/] {finding['mutation_description']}")
+        
+        if 'header_name' in finding and 'header_value' in finding:
+            _console().print(f"  [bold]Header:[/] {finding['header_name']}: {finding['header_value']}")
+        
+        if 'placement_type' in finding:
+            _console().print(f"  [bold]Placement:[/] {finding['placement_type']}")
+        
+        # Display detection details
+        if 'ratio' in finding:
+            _console().print(f"  [bold]Time Ratio:[/] {finding['ratio']:.2f}x")
+        
+        if 'response_time' in finding and 'baseline_time' in finding:
+            _console().print(f"  [bold]Response Time:[/] {finding['response_time']:.3f}s (baseline: {finding['baseline_time']:.3f}s)")
+        
+        if 'reason' in finding:
+            _console().print(f"  [bold]Reason:[/] {finding['reason']}")
     
-    # Print summary
-    console.print("\n[bold cyan]Scan Summary:[/]")
+    results[vuln_type] = result
+
+
+def _print_summary(results: Dict[str, Any]) -> None:
+    """Print the per-type scan summary."""
+    _console().print("\n[bold cyan]Scan Summary:[/]")
     for vuln_type, result in results.items():
         if isinstance(result, str) and result.startswith("Error:"):
-            console.print(f"  {vuln_type.upper()}: [bold red]Error: {result[7:]}[/]")
+            _console().print(f"  {vuln_type.upper()}: [bold red]Error: {result[7:]}[/]")
         elif result:
-            console.print(f"  {vuln_type.upper()}: [bold red]Vulnerable[/] ({len(result)} findings)")
+            _console().print(f"  {vuln_type.upper()}: [bold red]Vulnerable[/] ({len(result)} findings)")
         else:
-            console.print(f"  {vuln_type.upper()}: [bold green]Not vulnerable[/]")
+            _console().print(f"  {vuln_type.upper()}: [bold green]Not vulnerable[/]")
+
+
+class _LineSink:
+    """Accumulate written text and hand off each completed line to a callback."""
+    
+    def __init__(self, emit: Callable[[str], None], prefix: str = "") -> None:
+        self._emit = emit
+        self._prefix = prefix
+        # Fragments of the current, not yet terminated line
+        self._pending: List[str] = []
+    
+    def write(self, text: str) -> None:
+        # Only the newly written text is split on newlines, in one pass;
+        # earlier fragments are joined once when their line completes and
+        # the unterminated tail is carried over to the next write.
+        if '\n' not in text:
+            if text:
+                self._pending.append(text)
+            return
+        lines = text.split('\n')
+        if self._pending:
+            self._pending.append(lines[0])
+            lines[0] = ''.join(self._pending)
+            self._pending.clear()
+        tail = lines.pop()
+        emit, prefix = self._emit, self._prefix
+        for line in lines:
+            emit(f"{prefix}{line.rstrip()}")
+        if tail:
+            self._pending.append(tail)
+    
+    def close(self) -> None:
+        if self._pending:
+            self._emit(f"{self._prefix}{''.join(self._pending).rstrip()}")
+            self._pending.clear()
+
+
+class _ContextStream:
+    """Stand-in for sys.stdout/sys.stderr that routes writes per asyncio context.
+    
+    Detectors print directly to the standard streams. When a scan is running
+    through run_scan_api, writes made from its task are diverted to that scan's
+    sink; everything else falls through to the original stream.
+    """
+    
+    def __init__(self, fallback: Any, stream_name: str) -> None:
+        self._fallback = fallback
+        self._stream_name = stream_name
+    
+    def _sink(self) -> Optional[_LineSink]:
+        capture = _scan_capture.get()
+        return getattr(capture, self._stream_name) if capture else None
+    
+    def write(self, text: str) -> int:
+        sink = self._sink()
+        if sink is None:
+            return self._fallback.write(text)
+        sink.write(text)
+        return len(text)
+    
+    def flush(self) -> None:
+        if self._sink() is None:
+            self._fallback.flush()
+    
+    def isatty(self) -> bool:
+        return self._sink() is None and self._fallback.isatty()
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._fallback, name)
+
+
+class _ScanCapture:
+    """Per-scan pair of line sinks for captured stdout and stderr."""
+    
+    def __init__(self, emit: Callable[[str], None]) -> None:
+        self.stdout = _LineSink(emit)
+        self.stderr = _LineSink(emit, prefix="ERROR: ")
+    
+    def close(self) -> None:
+        self.stdout.close()
+        self.stderr.close()
+
+
+_scan_capture: contextvars.ContextVar[Optional[_ScanCapture]] = contextvars.ContextVar(
+    '_scan_capture', default=None
+)
+
+
+def _install_output_capture() -> None:
+    """Wrap sys.stdout/sys.stderr with context-aware streams (idempotent)."""
+    if not isinstance(sys.stdout, _ContextStream):
+        sys.stdout = _ContextStream(sys.stdout, 'stdout')
+    if not isinstance(sys.stderr, _ContextStream):
+        sys.stderr = _ContextStream(sys.stderr, 'stderr')
+
+
+def _install_scan_logging() -> None:
+    """Let each concurrent scan decide its own verbosity (idempotent).
+    
+    The application logger and its handlers are opened up to DEBUG once, and
+    ScanVerbosityFilter then drops DEBUG records from non-verbose scans based
+    on the scan_verbose context variable each scan sets. Records stop at the
+    application logger's own handlers: a verbose scan logs raw requests,
+    cookies included, which must not reach a host application's root handlers.
+    """
+    if any(isinstance(f, ScanVerbosityFilter) for f in logger.filters):
+        return
+    setup_logging()
+    logger.setLevel(logging.DEBUG)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setLevel(logging.DEBUG)
+    logger.addFilter(ScanVerbosityFilter())
+    logger.propagate = False
+
+
+async def run_scan_api(
+    url: str,
+    types: Optional[List[str]] = None,
+    headers: Optional[List[Tuple[str, str]]] = None,
+    timeout: float = 5.0,
+    exit_first: bool = False,
+    verbose: bool = False,
+    h2_payload_placement: Optional[str] = None,
+    output_batch_size: int = 1,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run a scan in-process and yield structured events as it progresses.
+    
+    This is the programmatic counterpart of the ``scan`` command, used by the
+    web frontend. Everything the scan would print is captured line by line
+    instead of going to the terminal.
+    
+    Args:
+        url: Target URL to scan
+        types: Vulnerability types to test; all available types if empty
+        headers: Custom (name, value) headers to include in requests
+        timeout: Request timeout in seconds
+        exit_first: Stop after finding the first vulnerability
+        verbose: Verbose output
+        h2_payload_placement: Where to place the HTTP/2 payload
+        output_batch_size: When greater than 1, output lines that are already
+            waiting are merged into one event with a ``lines`` list of up to
+            this many lines
+        
+    Yields:
+        Event dicts with a ``type`` ("info", "output", "error" or "status")
+        and a ``data`` string (or ``lines`` for batched output)
+    """
+    _install_output_capture()
+    _install_scan_logging()
+    queue: asyncio.Queue = asyncio.Queue()
+    capture = _ScanCapture(queue.put_nowait)
+    
+    async def _scan() -> None:
+        # Runs in its own task, so setting the capture and verbosity only
+        # affects this scan
+        _scan_capture.set(capture)
+        scan_verbose.set(verbose)
+        try:
+            vulnerability_types = _select_vulnerability_types(
+                _split_types(','.join(types or []))
+            )
+            if not vulnerability_types:
+                raise ValueError("No valid vulnerability types specified")
+            results = await _run_detectors(
+                url, vulnerability_types, list(headers or []), timeout,
+                exit_first, verbose, h2_payload_placement
+            )
+            _print_summary(results)
+        finally:
+            capture.close()
+            queue.put_nowait(None)
+    
+    yield {"type": "info", "data": f"Starting scan for {url}..."}
+    
+    task = asyncio.create_task(_scan())
+    try:
+        done = False
+        while not done:
+            line = await queue.get()
+            if line is None:
+                break
+            if output_batch_size <= 1:
+                yield {"type": "output", "data": line}
+                continue
+            # Take whatever else the scan has already produced
+            lines = [line]
+            while not queue.empty() and len(lines) < output_batch_size:
+                line = queue.get_nowait()
+                if line is None:
+                    done = True
+                    break
+                lines.append(line)
+            yield {"type": "output", "lines": lines}
+        await task
+    except Exception as e:
+        logger.exception("Scan failed")
+        yield {"type": "error", "data": f"Error running scan: {e}"}
+        yield {"type": "status", "data": "Failed"}
+        return
+    finally:
+        if not task.done():
+            task.cancel()
+    
+    yield {"type": "status", "data": "Complete"}
+    yield {"type": "info", "data": "Scan completed successfully"}
+
+
+H2_PAYLOAD_PLACEMENTS = ('normal_header', 'custom_header_value', 'custom_header_name', 'request_line')
+
+
+def _parse_request_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the ``request`` command."""
+    parser = argparse.ArgumentParser(
+        prog='hrs_finder request',
+        description='Send a custom HTTP/1.1 request to a target server. '
+                    'URL should be in the format http(s)://hostname[:port]/path',
+    )
+    parser.add_argument('url')
+    parser.add_argument('--method', '-m', default='GET', help='HTTP method to use')
+    parser.add_argument('--header', '-H', action='append', default=[], help='HTTP header (can be used multiple times)')
+    parser.add_argument('--data', '-d', help='HTTP request body')
+    parser.add_argument('--raw', '-r', help='Path to file containing raw HTTP request')
+    parser.add_argument('--keep-alive', action='store_true', help='Keep connection alive after request')
+    parser.add_argument('--timeout', '-t', type=float, default=15.0, help='Read timeout in seconds')
+    parser.add_argument('--connect-timeout', '-c', type=float, default=5.0, help='Connection timeout in seconds')
+    parser.add_argument('--output', '-o', help='Output file for response')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--verify-ssl', action='store_true', help='Verify SSL certificates')
+    return parser.parse_args(argv)
+
+
+def _parse_scan_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the ``scan`` command."""
+    parser = argparse.ArgumentParser(
+        prog='hrs_finder scan',
+        description='Scan a target for HTTP request smuggling vulnerabilities. '
+                    'URL should be in the format http(s)://hostname[:port]',
+    )
+    parser.add_argument('url_arg', nargs='?', metavar='URL')
+    parser.add_argument('-u', '--url', help='Target URL to scan (http(s)://hostname[:port])')
+    parser.add_argument('-t', '--type', help='Comma-separated vulnerability types to test (e.g., "cl.te,te.cl")')
+    parser.add_argument('-o', '--output', help='Output file for results (JSON)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
+    parser.add_argument('--verify-ssl', action='store_true', help='Verify SSL certificates')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Request timeout in seconds')
+    parser.add_argument('-e', '--exit-first', action='store_true', help='Stop after finding the first vulnerability')
+    parser.add_argument('-H', '--header', action='append', default=[], help='Custom header to include in requests (format: "Name: Value")')
+    parser.add_argument('-f', '--file', help='Path to file containing Transfer-Encoding header variations')
+    parser.add_argument('--h2-payload-placement', choices=H2_PAYLOAD_PLACEMENTS, help=f"Where to place the HTTP/2 payload ({', '.join(H2_PAYLOAD_PLACEMENTS)})")
+    return parser.parse_args(argv)
+
+
+# Subcommand name -> (argument parser, command function)
+COMMANDS = {
+    'request': (_parse_request_args, request),
+    'scan': (_parse_scan_args, scan),
+}
+
+
+def cli(argv: Optional[List[str]] = None) -> None:
+    """HTTP Request Smuggling Detection Tool.
+    
+    A Python toolkit for detecting HTTP request smuggling vulnerabilities.
+    Only the global options are parsed here; the selected subcommand parses
+    the rest of the arguments itself.
+    """
+    parser = argparse.ArgumentParser(
+        prog='hrs_finder',
+        description='HTTP Request Smuggling Detection Tool. '
+                    'A Python toolkit for detecting HTTP request smuggling vulnerabilities.',
+    )
+    parser.add_argument('--version', action='version', version=f'%(prog)s, version {__version__}')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    parser.add_argument('--log-file', help='Log file path')
+    parser.add_argument('command', choices=COMMANDS, help='Command to run')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        parser.print_help()
+        sys.exit(0)
+    options = parser.parse_args(argv)
+    
+    parse_command_args, command = COMMANDS[options.command]
+    command_args = parse_command_args(options.args)
+    
+    # Set up logging
+    log_level = 10 if options.debug else 20  # DEBUG=10, INFO=20
+    setup_logging(level=log_level, log_file=options.log_file, verbose=options.debug)
+    
+    command(**vars(command_args))
 
 
 def main():
@@ -440,8 +910,8 @@ def main():
     try:
         cli()
     except Exception as e:
-        console.print(f"[bold red]Unexpected error:[/] {e}")
-        get_logger().exception("Unhandled exception in main")
+        _console().print(f"[bold red]Unexpected error:[/] {e}")
+        logger.exception("Unhandled exception in main")
         sys.exit(1)
 
 
@@ -4,3 +4,22 @@ HTTP client implementations for the HTTP Request Smuggling Detection Tool.
 This package contains custom HTTP/1.1 and HTTP/2 clients designed to send
 non-RFC-compliant requests for detecting HTTP request smuggling vulnerabilities.
 """
+
+import importlib
+
+# Client classes are loaded on first access (PEP 562) so importing the
+# package does not pull in the HTTP/2 stack unless it is used.
+_LAZY_CLIENTS = {
+    'HTTP1Client': 'src.clients.http1',
+    'HTTP2Client': 'src.clients.http2',
+    'HTTP2ClientPool': 'src.clients.http2',
+}
+
+__all__ = list(_LAZY_CLIENTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_CLIENTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
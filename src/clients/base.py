@@ -5,17 +5,75 @@ This module defines the abstract base class that all HTTP clients must implement
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple, Union
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 import asyncio
+import os
 import ssl
+import weakref
+
+
+# Maximum number of idle keep-alive connections kept per target
+MAX_POOLED_CONNECTIONS = int(os.environ.get("HRS_MAX_POOLED_CONNECTIONS", "4"))
+
+# Requests a pooled connection may carry before it is closed instead of reused,
+# so per-connection state on the server side stays bounded
+MAX_REQUESTS_PER_CONNECTION = int(os.environ.get("HRS_MAX_REQUESTS_PER_CONNECTION", "100"))
+
+# Idle keep-alive connections per event loop, keyed by (host, port, use_tls,
+# ssl_context), each with the number of requests it has carried. The SSL
+# context is part of the key so a verifying client never gets a socket that
+# was set up without verification. Streams are bound to the loop that opened
+# them, so each loop has its own pool.
+_connection_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int, bool, Optional[ssl.SSLContext]], Deque[Tuple[asyncio.StreamReader, asyncio.StreamWriter, int]]]]" = weakref.WeakKeyDictionary()
+
+
+def _current_pool() -> Dict[Tuple[str, int, bool, Optional[ssl.SSLContext]], Deque[Tuple[asyncio.StreamReader, asyncio.StreamWriter, int]]]:
+    """Return the idle connection pool of the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _connection_pools.get(loop)
+    if pool is None:
+        pool = _connection_pools[loop] = {}
+    return pool
+
+
+def _has_buffered_data(reader: asyncio.StreamReader) -> bool:
+    """Return whether the reader holds bytes nobody has read yet.
+    
+    StreamReader has no public way to ask, so this looks at its buffer.
+    """
+    return bool(getattr(reader, '_buffer', None))
+
+
+async def close_pooled_connections() -> None:
+    """Close every idle pooled connection of the running event loop.
+    
+    Call this before the loop shuts down, so pooled sockets are closed
+    instead of being left to the garbage collector.
+    """
+    pool = _connection_pools.pop(asyncio.get_running_loop(), None)
+    if not pool:
+        return
+    writers = [writer for idle in pool.values() for _, writer, _ in idle]
+    for writer in writers:
+        writer.close()
+    await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
 
 
 class BaseClient(ABC):
     """Abstract base class for HTTP clients.
     
     Defines the interface that both HTTP/1.1 and HTTP/2 clients must implement.
+    Clients are async context managers that connect on entry and close on exit.
+    Clients are created per probe during a scan, so they use __slots__ instead
+    of a per-instance __dict__; subclasses declare their own slots as well.
     """
     
+    __slots__ = (
+        'host', 'port', 'use_tls', 'timeout', 'connect_timeout',
+        'ssl_context', '_reader', '_writer', '_connected', '_requests_sent',
+    )
+    
     def __init__(
         self, 
         host: str, 
@@ -42,7 +100,17 @@ class BaseClient(ABC):
         self._reader: Optional[asyncio.StreamReader] = None
         self._writer: Optional[asyncio.StreamWriter] = None
         self._connected = False
+        self._requests_sent = 0
         
+    async def __aenter__(self) -> "BaseClient":
+        """Connect on entering an async with block."""
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the connection on leaving an async with block."""
+        await self.close()
+    
     @abstractmethod
     async def connect(self) -> None:
         """Establish a connection to the target server."""
@@ -82,6 +150,52 @@ class BaseClient(ABC):
         """Return whether the client is currently connected."""
         return self._connected
     
+    def _pool_key(self) -> Tuple[str, int, bool, Optional[ssl.SSLContext]]:
+        """Key of the idle connections this client may share."""
+        return (self.host, self.port, self.use_tls, self.ssl_context if self.use_tls else None)
+    
+    def _acquire_pooled(self) -> bool:
+        """Adopt an idle pooled connection to the same target, if one is still open.
+        
+        Returns:
+            True if a pooled connection is now in use
+        """
+        idle = _current_pool().get(self._pool_key())
+        while idle:
+            reader, writer, requests_sent = idle.pop()
+            # Bytes that arrived while idle belong to no request of ours, and
+            # would be read as the response to the next one
+            if writer.is_closing() or reader.at_eof() or _has_buffered_data(reader):
+                writer.close()
+                continue
+            self._reader, self._writer = reader, writer
+            self._requests_sent = requests_sent
+            self._connected = True
+            return True
+        return False
+    
+    def _release_to_pool(self) -> bool:
+        """Hand the current connection to the pool instead of closing it.
+        
+        Returns:
+            True if the connection was pooled, False if the caller should close it
+        """
+        if not self._connected or self._writer is None or self._writer.is_closing():
+            return False
+        if self._requests_sent >= MAX_REQUESTS_PER_CONNECTION:
+            return False
+        # Unread bytes mean the connection is not at a response boundary
+        if self._reader is None or _has_buffered_data(self._reader):
+            return False
+        idle = _current_pool().setdefault(self._pool_key(), deque())
+        if len(idle) >= MAX_POOLED_CONNECTIONS:
+            return False
+        idle.append((self._reader, self._writer, self._requests_sent))
+        self._reader = None
+        self._writer = None
+        self._connected = False
+        return True
+    
     @abstractmethod
     async def send_raw(self, data: bytes) -> None:
         """Send raw bytes over the connection.
@@ -7,15 +7,106 @@ HTTP request smuggling detection.
 """
 
 import asyncio
-import logging
-import re
+import functools
+import socket
 import ssl
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+try:
+    import httptools
+except ImportError:
+    httptools = None
+
 from src.clients.base import BaseClient
 from src.utils import tls
-from src.utils.logging import get_logger
+from src.utils.logging import debug_enabled, get_logger
+
+# StreamReader buffer limit; large enough that a whole response header block
+# is found with a single readuntil()
+READER_LIMIT = 1 << 20
+
+# Read size when draining a body until the connection closes
+READ_CHUNK_SIZE = 65536
+
+# Pre-encoded request line pieces for the common methods
+_METHOD_BYTES = {
+    method: f"{method} ".encode("ascii")
+    for method in ('GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS', 'PATCH', 'CONNECT', 'TRACE')
+}
+_HTTP11 = b" HTTP/1.1\r\n"
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_prefix(method: str, path: str, headers: Tuple[Tuple[str, str], ...]) -> bytes:
+    """Build the request line and header block of an HTTP/1.1 request.
+    
+    Probes repeat the same request head with different bodies, so the
+    encoded head is cached per (method, path, headers).
+    """
+    # Start with request line
+    method_bytes = _METHOD_BYTES.get(method)
+    if method_bytes is None:
+        method_bytes = method.encode("utf-8", "surrogateescape") + b" "
+    buf = bytearray(method_bytes)
+    buf += path.encode("utf-8", "surrogateescape")
+    buf += _HTTP11
+    
+    # Add headers exactly as provided (preserving case, order, duplicates)
+    for name, value in headers:
+        buf += name.encode("utf-8", "surrogateescape")
+        buf += b": "
+        buf += value.encode("utf-8", "surrogateescape")
+        buf += b"\r\n"
+    
+    # End headers
+    buf += b"\r\n"
+    return bytes(buf)
+
+
+class _HeadCollector:
+    """httptools parser callbacks that collect a response's status line and headers."""
+    
+    __slots__ = ('status_message', 'headers', 'complete')
+    
+    def __init__(self) -> None:
+        self.status_message = ''
+        self.headers: List[Tuple[str, str]] = []
+        self.complete = False
+    
+    def on_status(self, status: bytes) -> None:
+        self.status_message += status.decode('utf-8', errors='replace')
+    
+    def on_header(self, name: bytes, value: bytes) -> None:
+        self.headers.append((
+            name.decode('utf-8', errors='replace').strip(),
+            value.decode('utf-8', errors='replace').strip(),
+        ))
+    
+    def on_headers_complete(self) -> None:
+        self.complete = True
+
+
+def _parse_head_fast(header_data: bytes) -> Optional[Tuple[int, str, List[Tuple[str, str]]]]:
+    """Parse a response's status line and headers with httptools, when installed.
+    
+    The C parser is strict, so malformed responses - which smuggling probes
+    provoke on purpose - are left to the lenient parser in HTTP1Client.
+    
+    Returns:
+        Tuple of (status_code, status_message, headers), or None to fall back
+    """
+    if httptools is None:
+        return None
+    collector = _HeadCollector()
+    parser = httptools.HttpResponseParser(collector)
+    try:
+        parser.feed_data(header_data)
+    except httptools.HttpParserError:
+        return None
+    if not collector.complete or not parser.get_http_version().startswith('1.'):
+        return None
+    return parser.get_status_code(), collector.status_message, collector.headers
 
 
 class HTTP1Client(BaseClient):
@@ -29,6 +120,8 @@ class HTTP1Client(BaseClient):
     - Timing measurement for differential timing attacks
     """
     
+    __slots__ = ('keep_alive', 'verify_ssl', '_response_buffer', '_reusable', 'logger')
+    
     def __init__(
         self,
         host: str,
@@ -54,6 +147,8 @@ class HTTP1Client(BaseClient):
         self.keep_alive = keep_alive
         self.verify_ssl = verify_ssl
         self._response_buffer = bytearray()
+        # Whether the connection is at a clean response boundary and may be reused
+        self._reusable = False
         self.logger = get_logger()
         
         # Initialize SSL context if needed
@@ -64,20 +159,28 @@ class HTTP1Client(BaseClient):
         """Establish a connection to the target server."""
         if self._connected:
             return
+        
+        # Keep-alive clients reuse an idle connection to the same target when available
+        if self.keep_alive and self._acquire_pooled():
+            self.logger.debug("Reusing pooled connection to %s:%s", self.host, self.port)
+            return
             
         try:
-            self.logger.debug(f"Connecting to {self.host}:{self.port} ({'HTTPS' if self.use_tls else 'HTTP'})")
+            self.logger.debug("Connecting to %s:%s (%s)", self.host, self.port, 'HTTPS' if self.use_tls else 'HTTP')
             connect_task = asyncio.open_connection(
                 self.host,
                 self.port,
-                ssl=self.ssl_context if self.use_tls else None
+                ssl=tls.resumable_context(self.ssl_context, self.host, self.port) if self.use_tls else None,
+                limit=READER_LIMIT,
             )
             self._reader, self._writer = await asyncio.wait_for(
                 connect_task, 
                 timeout=self.connect_timeout
             )
             self._connected = True
+            self._requests_sent = 0
             self.logger.debug("Connection established")
+            self._configure_socket()
             
             # Log negotiated protocol if using TLS
             if self.use_tls and self._writer.get_extra_info('ssl_object'):
@@ -85,6 +188,8 @@ class HTTP1Client(BaseClient):
                 protocol = tls.get_negotiated_protocol(ssl_object)
                 if protocol:
                     self.logger.debug(f"Negotiated protocol: {protocol}")
+                if ssl_object.session_reused:
+                    self.logger.debug("Resumed TLS session")
                     
         except asyncio.TimeoutError:
             self.logger.error(f"Connection to {self.host}:{self.port} timed out")
@@ -93,10 +198,41 @@ class HTTP1Client(BaseClient):
             self.logger.error(f"Failed to connect to {self.host}:{self.port}: {e}")
             raise ConnectionError(f"Failed to connect to {self.host}:{self.port}: {e}")
     
+    def _configure_socket(self) -> None:
+        """Tune the freshly connected socket for small, latency-sensitive probes.
+        
+        Disables Nagle's algorithm so a probe is never held back waiting for
+        the previous segment's ACK, and enables TCP keep-alive on connections
+        that are meant to be reused.
+        """
+        sock = self._writer.get_extra_info('socket')
+        if sock is None:
+            return
+        try:
+            if hasattr(socket, 'TCP_NODELAY'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.keep_alive:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except OSError as e:
+            self.logger.debug(f"Could not set socket options: {e}")
+    
     async def close(self) -> None:
-        """Close the connection to the target server."""
+        """Close the connection to the target server.
+        
+        A keep-alive connection that ended on a complete response is returned
+        to the connection pool instead.
+        """
         if not self._connected or not self._writer:
             return
+        
+        if self.use_tls:
+            tls.store_session(self.ssl_context, self.host, self.port, self._writer.get_extra_info('ssl_object'))
+        
+        if self.keep_alive and self._reusable and self._release_to_pool():
+            self.logger.debug("Returned connection to the pool")
+            self._reusable = False
+            self._response_buffer.clear()
+            return
             
         try:
             self.logger.debug("Closing connection")
@@ -120,7 +256,7 @@ class HTTP1Client(BaseClient):
             await self.connect()
             
         try:
-            self.logger.debug(f"Sending {len(data)} bytes")
+            self.logger.debug("Sending %d bytes", len(data))
             self._writer.write(data)
             await self._writer.drain()
         except Exception as e:
@@ -141,12 +277,12 @@ class HTTP1Client(BaseClient):
             raise ConnectionError("Not connected")
             
         try:
-            self.logger.debug(f"Receiving up to {max_size} bytes")
+            self.logger.debug("Receiving up to %d bytes", max_size)
             data = await asyncio.wait_for(
                 self._reader.read(max_size),
                 timeout=self.timeout
             )
-            self.logger.debug(f"Received {len(data)} bytes")
+            self.logger.debug("Received %d bytes", len(data))
             return data
         except asyncio.TimeoutError:
             self.logger.error(f"Read timed out after {self.timeout} seconds")
@@ -174,24 +310,12 @@ class HTTP1Client(BaseClient):
         Returns:
             Raw HTTP/1.1 request as bytes
         """
-        # Start with request line
-        request_parts = [f"{method} {path} HTTP/1.1\r\n"]
-        
-        # Add headers exactly as provided (preserving case, order, duplicates)
-        for name, value in headers:
-            request_parts.append(f"{name}: {value}\r\n")
-        
-        # End headers
-        request_parts.append("\r\n")
-        
-        # Convert to bytes
-        request_bytes = "".join(request_parts).encode("utf-8", errors="surrogateescape")
+        prefix = _build_prefix(method, path, tuple(headers))
         
         # Add body if provided
         if body:
-            request_bytes += body
-            
-        return request_bytes
+            return prefix + body
+        return prefix
     
     async def send_request(
         self,
@@ -208,7 +332,8 @@ class HTTP1Client(BaseClient):
             path: Request path
             headers: List of (name, value) header tuples
             body: Request body as bytes
-            raw_request: Raw request bytes to send (overrides other parameters if provided)
+            raw_request: Raw request bytes (or any bytes-like object, such as a
+                memoryview of a mapped file) to send; overrides other parameters if provided
             
         Returns:
             Tuple of (response_info, response_body)
@@ -224,42 +349,54 @@ class HTTP1Client(BaseClient):
         # Use raw_request if provided, otherwise build the request
         request_data = raw_request if raw_request else self._build_request(method, path, headers, body)
         
-        # Log the request
-        if raw_request:
+        # Log the request; the messages are only formatted when debug output is on
+        debug = debug_enabled(self.logger)
+        if debug and raw_request:
             self.logger.debug(f"Sending raw request ({len(raw_request)} bytes)")
-            if self.logger.level <= logging.DEBUG:
-                try:
-                    self.logger.debug(raw_request[:1024].decode('utf-8', errors='replace'))
-                    if len(raw_request) > 1024:
-                        self.logger.debug("... (truncated)")
-                except Exception:
-                    self.logger.debug(f"<Binary data: {len(raw_request)} bytes>")
-        else:
+            try:
+                self.logger.debug(bytes(raw_request[:1024]).decode('utf-8', errors='replace'))
+                if len(raw_request) > 1024:
+                    self.logger.debug("... (truncated)")
+            except Exception:
+                self.logger.debug(f"<Binary data: {len(raw_request)} bytes>")
+        elif debug:
             self.logger.debug(f"Sending {method} request to {path}")
             for name, value in headers:
                 self.logger.debug(f"  {name}: {value}")
             if body:
                 self.logger.debug(f"  Body: {len(body)} bytes")
         
-        # Record start time for timing measurements
-        start_time = time.time()
+        # Record start time for timing measurements; a monotonic clock is
+        # immune to wall-clock adjustments during a timing comparison
+        start_ns = time.monotonic_ns()
+        
+        # Until a complete response is read the connection is mid-exchange
+        self._reusable = False
+        self._requests_sent += 1
         
         # Send the request
         await self.send_raw(request_data)
         
         try:
             # Parse the response
-            response_info, response_body = await self._parse_response()
+            if raw_request:
+                head = raw_request[:5] == b'HEAD '
+            else:
+                head = method.upper() == 'HEAD'
+            response_info, response_body = await self._parse_response(head=head)
             
-            # Record end time
-            end_time = time.time()
-            response_info['response_time'] = end_time - start_time
+            # Record elapsed time, in nanoseconds and in seconds
+            elapsed_ns = time.monotonic_ns() - start_ns
+            response_info['response_time_ns'] = elapsed_ns
+            response_info['response_time'] = elapsed_ns / 1e9
+            self._reusable = self._is_reusable(response_info)
             
             # Log the response
-            self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
-            for name, value in response_info.get('headers', []):
-                self.logger.debug(f"  {name}: {value}")
-            self.logger.debug(f"  Body: {len(response_body)} bytes")
+            if debug:
+                self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
+                for name, value in response_info.get('headers', []):
+                    self.logger.debug(f"  {name}: {value}")
+                self.logger.debug(f"  Body: {len(response_body)} bytes")
             
             # Close connection if not keep-alive
             if not self.keep_alive:
@@ -273,9 +410,33 @@ class HTTP1Client(BaseClient):
                 await self.close()
             raise TimeoutError(f"Request timed out after {self.timeout} seconds")
     
-    async def _parse_response(self) -> Tuple[Dict[str, Any], bytes]:
+    @staticmethod
+    def _is_reusable(response_info: Dict[str, Any]) -> bool:
+        """Check whether the connection can carry another request after this response.
+        
+        Only responses whose delimited body was read to its end leave the
+        connection at a known boundary; one read until close, cut short, or
+        marked Connection: close, does not.
+        """
+        if not response_info['body_complete']:
+            return False
+        if (
+            response_info['has_body']
+            and not response_info['chunked']
+            and response_info['content_length'] is None
+        ):
+            return False
+        return not any(
+            name.lower() == 'connection' and 'close' in value.lower()
+            for name, value in response_info['headers']
+        )
+    
+    async def _parse_response(self, head: bool = False) -> Tuple[Dict[str, Any], bytes]:
         """Parse an HTTP/1.1 response.
         
+        Args:
+            head: Whether the response answers a HEAD request
+            
         Returns:
             Tuple of (response_info, response_body)
         """
@@ -285,29 +446,11 @@ class HTTP1Client(BaseClient):
         # Read the response headers
         header_data = await self._read_headers()
         
-        # Parse status line
-        status_match = re.match(rb'HTTP/1\.[01] (\d+) (.*?)\r\n', header_data)
-        if not status_match:
-            raise ValueError("Invalid HTTP response")
-            
-        status_code = int(status_match.group(1))
-        status_message = status_match.group(2).decode('utf-8', errors='replace')
-        
-        # Parse headers
-        header_lines = header_data[status_match.end():].split(b'\r\n')
-        headers = []
-        for line in header_lines:
-            if not line:
-                continue
-            try:
-                name, value = line.split(b':', 1)
-                headers.append((
-                    name.decode('utf-8', errors='replace').strip(),
-                    value.decode('utf-8', errors='replace').strip()
-                ))
-            except ValueError:
-                # Skip invalid headers
-                continue
+        parsed = _parse_head_fast(header_data)
+        if parsed is not None:
+            status_code, status_message, headers = parsed
+        else:
+            status_code, status_message, headers = self._parse_head(header_data)
         
         # Determine body length
         content_length = None
@@ -315,23 +458,34 @@ class HTTP1Client(BaseClient):
         chunked = False
         
         for name, value in headers:
-            if name.lower() == 'content-length':
+            lname = name.lower()
+            if lname == 'content-length':
                 try:
                     content_length = int(value)
                 except ValueError:
                     pass
-            elif name.lower() == 'transfer-encoding' and 'chunked' in value.lower():
+            elif lname == 'transfer-encoding' and 'chunked' in value.lower():
                 transfer_encoding = value
                 chunked = True
         
-        # Read the body based on headers
-        if chunked:
-            body = await self._read_chunked_body()
+        # Responses to HEAD and 1xx/204/304 responses never have a body,
+        # whatever their headers say (RFC 7230, section 3.3.3)
+        has_body = not (head or 100 <= status_code < 200 or status_code in (204, 304))
+        
+        # Read the body based on headers, noting whether it ended where its
+        # framing says it should
+        if not has_body:
+            body = b''
+            body_complete = True
+        elif chunked:
+            body, body_complete = await self._read_chunked_body()
         elif content_length is not None:
             body = await self._read_content_length_body(content_length)
+            body_complete = len(body) == content_length
         else:
             # No content-length or transfer-encoding, try to read until connection closes
             body = await self._read_until_close()
+            body_complete = False
         
         response_info = {
             'status_code': status_code,
@@ -339,10 +493,58 @@ class HTTP1Client(BaseClient):
             'headers': headers,
             'chunked': chunked,
             'content_length': content_length,
+            'has_body': has_body,
+            'body_complete': body_complete,
         }
         
         return response_info, body
     
+    @staticmethod
+    def _parse_head(header_data: bytes) -> Tuple[int, str, List[Tuple[str, str]]]:
+        """Leniently parse a response's status line and headers.
+        
+        Args:
+            header_data: Raw header block, including the status line
+            
+        Returns:
+            Tuple of (status_code, status_message, headers)
+            
+        Raises:
+            ValueError: If the status line is not a valid HTTP/1.x status line
+        """
+        # Parse status line: HTTP/1.x <code> [<reason>]
+        status_end = header_data.find(b'\r\n')
+        if status_end == -1:
+            raise ValueError("Invalid HTTP response")
+        status_parts = header_data[:status_end].split(b' ', 2)
+        if (
+            len(status_parts) < 2
+            or status_parts[0] not in (b'HTTP/1.0', b'HTTP/1.1')
+            or not status_parts[1].isdigit()
+        ):
+            raise ValueError("Invalid HTTP response")
+            
+        status_code = int(status_parts[1])
+        status_message = status_parts[2].decode('utf-8', errors='replace') if len(status_parts) > 2 else ''
+        
+        # Parse headers; the block is decoded once and split as text
+        header_text = header_data[status_end + 2:].decode('utf-8', errors='replace')
+        headers = []
+        pos = 0
+        text_len = len(header_text)
+        while pos < text_len:
+            # Walk line offsets instead of building a list of lines
+            eol = header_text.find('\r\n', pos)
+            if eol < 0:
+                eol = text_len
+            colon = header_text.find(':', pos, eol)
+            # Empty and invalid header lines have no colon and are skipped
+            if colon >= 0:
+                headers.append((header_text[pos:colon].strip(), header_text[colon + 1:eol].strip()))
+            pos = eol + 2
+        
+        return status_code, status_message, headers
+    
     async def _read_headers(self) -> bytes:
         """Read HTTP headers from the connection.
         
@@ -352,38 +554,17 @@ class HTTP1Client(BaseClient):
         if not self._connected or not self._reader:
             raise ConnectionError("Not connected")
             
-        header_data = bytearray()
-        
-        # Read until we find the end of headers marker (\r\n\r\n)
-        while True:
-            try:
-                chunk = await asyncio.wait_for(
-                    self._reader.readuntil(b'\r\n\r\n'),
-                    timeout=self.timeout
-                )
-                header_data.extend(chunk)
-                break
-            except asyncio.IncompleteReadError as e:
-                if e.partial:
-                    header_data.extend(e.partial)
-                if b'\r\n\r\n' in header_data:
-                    break
-                if not e.partial:  # Connection closed
-                    break
-            except asyncio.LimitOverrunError as e:
-                # Read the available data and continue
-                chunk = await self._reader.readexactly(e.consumed)
-                header_data.extend(chunk)
-                if b'\r\n\r\n' in header_data:
-                    break
-            except asyncio.TimeoutError:
-                raise TimeoutError(f"Read timed out after {self.timeout} seconds")
-        
-        # Return everything up to the end of headers
-        end_idx = header_data.find(b'\r\n\r\n')
-        if end_idx != -1:
-            return bytes(header_data[:end_idx + 4])  # Include the \r\n\r\n
-        return bytes(header_data)
+        # Read up to and including the end of headers marker (\r\n\r\n)
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await self._reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            # Connection closed before the headers ended; return what arrived
+            return e.partial
+        except asyncio.LimitOverrunError:
+            raise ValueError(f"Response headers exceed {READER_LIMIT} bytes")
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Read timed out after {self.timeout} seconds")
     
     async def _read_content_length_body(self, content_length: int) -> bytes:
         """Read a body with a known Content-Length.
@@ -401,77 +582,76 @@ class HTTP1Client(BaseClient):
             return b''
             
         try:
-            body = await asyncio.wait_for(
-                self._reader.readexactly(content_length),
-                timeout=self.timeout
-            )
-            return body
+            async with asyncio.timeout(self.timeout):
+                return await self._reader.readexactly(content_length)
         except asyncio.IncompleteReadError as e:
             # Return partial data if the connection closed prematurely
             return e.partial
         except asyncio.TimeoutError:
             raise TimeoutError(f"Read timed out after {self.timeout} seconds")
     
-    async def _read_chunked_body(self) -> bytes:
+    async def _read_chunked_body(self) -> Tuple[bytes, bool]:
         """Read a chunked-encoded body.
         
         Returns:
-            Decoded body data as bytes
+            Tuple of (decoded body data, whether the terminating chunk and
+            its CRLF were read)
         """
         if not self._connected or not self._reader:
             raise ConnectionError("Not connected")
             
-        body = bytearray()
+        # Chunks are collected and joined once at the end
+        parts: List[bytes] = []
+        loop = asyncio.get_running_loop()
+        reading_size_line = False
+        complete = False
         
-        while True:
-            # Read the chunk size line
-            try:
-                chunk_size_line = await asyncio.wait_for(
-                    self._reader.readuntil(b'\r\n'),
-                    timeout=self.timeout
-                )
-            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
-                # Incomplete chunk size, return what we have
-                break
-                
-            # Parse the chunk size
-            chunk_size_hex = chunk_size_line.split(b';')[0].strip()
-            try:
-                chunk_size = int(chunk_size_hex, 16)
-            except ValueError:
-                # Invalid chunk size, stop reading
-                break
-                
-            # Zero-sized chunk means end of body
-            if chunk_size == 0:
-                # Read the final CRLF
-                try:
-                    await asyncio.wait_for(
-                        self._reader.readexactly(2),
-                        timeout=self.timeout
-                    )
-                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
-                    pass
-                break
-                
-            # Read the chunk data
-            try:
-                chunk_data = await asyncio.wait_for(
-                    self._reader.readexactly(chunk_size),
-                    timeout=self.timeout
-                )
-                body.extend(chunk_data)
-                
-                # Read the CRLF after the chunk
-                await asyncio.wait_for(
-                    self._reader.readexactly(2),
-                    timeout=self.timeout
-                )
-            except (asyncio.IncompleteReadError, asyncio.TimeoutError):
-                # Incomplete chunk, return what we have
-                break
-        
-        return bytes(body)
+        # One idle timeout for the whole body, pushed back after every chunk
+        try:
+            async with asyncio.timeout(self.timeout) as idle:
+                while True:
+                    # Read the chunk size line
+                    reading_size_line = True
+                    try:
+                        chunk_size_line = await self._reader.readuntil(b'\r\n')
+                    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                        # Incomplete chunk size, return what we have
+                        break
+                    reading_size_line = False
+                        
+                    # Parse the chunk size
+                    chunk_size_hex = chunk_size_line.split(b';')[0].strip()
+                    try:
+                        chunk_size = int(chunk_size_hex, 16)
+                    except ValueError:
+                        # Invalid chunk size, stop reading
+                        break
+                        
+                    # Zero-sized chunk means end of body
+                    if chunk_size == 0:
+                        # Read the final CRLF; trailers or anything else
+                        # leave the connection at an unknown position
+                        try:
+                            complete = await self._reader.readexactly(2) == b'\r\n'
+                        except asyncio.IncompleteReadError:
+                            pass
+                        break
+                        
+                    # Read the chunk data and the CRLF after it
+                    try:
+                        parts.append(await self._reader.readexactly(chunk_size))
+                        await self._reader.readexactly(2)
+                    except asyncio.IncompleteReadError:
+                        # Incomplete chunk, return what we have
+                        break
+                    idle.reschedule(loop.time() + self.timeout)
+        except TimeoutError:
+            # A stalled chunk size line is a timed out response; a stall
+            # inside a chunk returns what was read
+            if reading_size_line:
+                raise
+        
+        return b"".join(parts), complete
     
     async def _read_until_close(self) -> bytes:
         """Read body data until the connection closes.
@@ -482,22 +662,25 @@ class HTTP1Client(BaseClient):
         if not self._connected or not self._reader:
             raise ConnectionError("Not connected")
             
-        body = bytearray()
+        # Collect whole chunks and join them once, instead of growing a buffer
+        parts = []
         
+        loop = asyncio.get_running_loop()
+        
+        # One idle timeout for the whole body, pushed back after every read
         try:
-            while True:
-                chunk = await asyncio.wait_for(
-                    self._reader.read(8192),
-                    timeout=self.timeout
-                )
-                if not chunk:  # Connection closed
-                    break
-                body.extend(chunk)
-        except (asyncio.TimeoutError, ConnectionError):
+            async with asyncio.timeout(self.timeout) as idle:
+                while True:
+                    chunk = await self._reader.read(READ_CHUNK_SIZE)
+                    if not chunk:  # Connection closed
+                        break
+                    parts.append(chunk)
+                    idle.reschedule(loop.time() + self.timeout)
+        except (TimeoutError, ConnectionError):
             # Return what we have so far
             pass
             
-        return bytes(body)
+        return b"".join(parts)
     
     async def pipeline_requests(
         self,
@@ -514,19 +697,49 @@ class HTTP1Client(BaseClient):
         if not self._connected:
             await self.connect()
             
-        self.logger.debug(f"Sending {len(requests)} pipelined requests")
+        self.logger.debug("Sending %d pipelined requests", len(requests))
             
-        # Build and send all requests at once
-        for method, path, headers, body in requests:
-            request_data = self._build_request(method, path, headers, body)
+        # Build all requests and send them with a single write and drain
+        request_data = b"".join([
+            self._build_request(method, path, headers, body)
+            for method, path, headers, body in requests
+        ])
+        self._reusable = False
+        self._requests_sent += len(requests)
+        
+        # Start reading before the send is drained, so responses to the first
+        # requests are consumed while the rest of a large pipeline is written
+        reader_task = asyncio.create_task(self._read_pipelined_responses(requests))
+        try:
             await self.send_raw(request_data)
+        except BaseException:
+            reader_task.cancel()
+            raise
+        responses = await reader_task
+                
+        # Close connection if not keep-alive
+        if not self.keep_alive:
+            await self.close()
             
-        # Read all responses
+        return responses
+    
+    async def _read_pipelined_responses(
+        self,
+        requests: List[Tuple[str, str, List[Tuple[str, str]], Optional[bytes]]],
+    ) -> List[Tuple[Dict[str, Any], bytes]]:
+        """Read the responses to pipelined requests, in request order.
+        
+        Args:
+            requests: List of (method, path, headers, body) tuples that were sent
+            
+        Returns:
+            List of (response_info, response_body) tuples
+        """
         responses = []
         for i, (method, path, _, _) in enumerate(requests):
             try:
-                self.logger.debug(f"Reading response {i+1}/{len(requests)} for {method} {path}")
-                response_info, response_body = await self._parse_response()
+                self.logger.debug("Reading response %d/%d for %s %s", i + 1, len(requests), method, path)
+                response_info, response_body = await self._parse_response(head=method.upper() == 'HEAD')
                 responses.append((response_info, response_body))
             except Exception as e:
                 # If we can't parse a response, add an error response
@@ -534,9 +747,7 @@ class HTTP1Client(BaseClient):
                 responses.append(({'error': str(e)}, b''))
                 # Stop reading responses
                 break
-                
-        # Close connection if not keep-alive
-        if not self.keep_alive:
-            await self.close()
-            
+        else:
+            # Every response was read, so the connection is at a clean boundary
+            self._reusable = bool(responses) and self._is_reusable(responses[-1][0])
         return responses
@@ -4,23 +4,109 @@ Custom HTTP/2 Client implementation.
 This module provides a low-level HTTP/2 client that allows for complete control
 over request construction, including non-RFC-compliant requests needed for
 HTTP request smuggling detection.
+
+Request frames are written with StreamWriter.writelines(); on Python 3.12+
+asyncio sends such a batch with a single sendmsg() call instead of joining it.
+The client is loop-agnostic: the CLI and the web frontend run it on uvloop
+when that is installed, which makes the read/drain round trips much cheaper.
 """
 
 import asyncio
-import logging
+import contextlib
+import functools
+import socket
 import ssl
+import struct
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 import h2.config
 import h2.connection
+import h2.errors
 import h2.events
 import h2.exceptions
 import h2.settings
 
 from src.clients.base import BaseClient
 from src.utils import tls
-from src.utils.logging import get_logger
+from src.utils.logging import debug_enabled, get_logger
+
+
+@functools.lru_cache(maxsize=512)
+def _lower(name: str) -> str:
+    """Lowercase a header name; probes reuse the same names, so results are cached."""
+    return name.lower()
+
+
+class _StreamState:
+    """Response state of one HTTP/2 stream."""
+    
+    __slots__ = ('ended', 'status_code', 'headers', 'chunks')
+    
+    def __init__(self) -> None:
+        self.ended = False
+        # Response headers, decoded as soon as they arrive
+        self.status_code: Optional[int] = None
+        self.headers: List[Tuple[str, str]] = []
+        # DATA frame payloads, joined once when the response is parsed
+        self.chunks: List[bytes] = []
+
+
+def _on_stream_response(stream: _StreamState, event: h2.events.ResponseReceived) -> None:
+    append = stream.headers.append
+    for name, value in event.headers:
+        if name == b':status' or name == ':status':
+            stream.status_code = int(value)
+            continue
+        # Header octets are nearly always ASCII, which decodes
+        # without going through the UTF-8 decoder
+        if isinstance(name, bytes):
+            name = name.decode('ascii') if name.isascii() else name.decode('utf-8', errors='replace')
+        if isinstance(value, bytes):
+            value = value.decode('ascii') if value.isascii() else value.decode('utf-8', errors='replace')
+        if not name.startswith(':'):
+            append((name, value))
+
+
+def _on_stream_data(stream: _StreamState, event: h2.events.DataReceived) -> None:
+    stream.chunks.append(event.data)
+
+
+def _on_stream_end(stream: _StreamState, event: h2.events.Event) -> None:
+    stream.ended = True
+
+
+# Stream events that update a stream's response state, by exact event type
+_STREAM_EVENT_HANDLERS = {
+    h2.events.ResponseReceived: _on_stream_response,
+    h2.events.DataReceived: _on_stream_data,
+    h2.events.StreamEnded: _on_stream_end,
+    h2.events.StreamReset: _on_stream_end,
+}
+
+
+# Upper bound on streams in flight on one connection, used when the server
+# does not announce a lower SETTINGS_MAX_CONCURRENT_STREAMS
+MAX_CONCURRENT_STREAMS = 100
+
+# DATA frame type and flags (RFC 7540, section 6.1)
+_FRAME_TYPE_DATA = 0x0
+_FLAG_END_STREAM = 0x1
+_FLAG_PADDED = 0x8
+
+
+def _padded_data_frame(stream_id: int, body: bytes, padding_length: int, end_stream: bool) -> bytearray:
+    """Encode a PADDED DATA frame into a single preallocated buffer.
+    
+    Layout: 9-byte frame header, 1-byte pad length, body, zeroed padding.
+    """
+    payload_length = 1 + len(body) + padding_length
+    frame = bytearray(9 + payload_length)
+    flags = _FLAG_PADDED | (_FLAG_END_STREAM if end_stream else 0)
+    # 24-bit length and 8-bit type, flags, stream identifier, pad length
+    struct.pack_into('>IBIB', frame, 0, payload_length << 8 | _FRAME_TYPE_DATA, flags, stream_id, padding_length)
+    frame[10:10 + len(body)] = body
+    return frame
 
 
 class HTTP2Client(BaseClient):
@@ -35,6 +121,12 @@ class HTTP2Client(BaseClient):
     - Control over DATA frames (partial bodies, withheld termination, padding)
     """
     
+    __slots__ = (
+        'verify_ssl', 'force_http2', 'verbose', 'logger', '_dbg', '_scheme_header', '_authority_header',
+        '_h2_conn', '_stream_id', '_read_lock',
+        '_streams', '_stream_slots',
+    )
+    
     def __init__(
         self,
         host: str,
@@ -67,28 +159,34 @@ class HTTP2Client(BaseClient):
         self.force_http2 = force_http2
         self.verbose = verbose  # Add verbose attribute
         
+        # Pseudo-headers shared by every request on this client
+        self._scheme_header = (':scheme', 'https' if use_tls else 'http')
+        self._authority_header = (':authority', f"{host}:{port}")
+        
         # Set up SSL context
         self.ssl_context = None
         if self.use_tls:
-            self.ssl_context = tls.create_ssl_context(
-                verify=self.verify_ssl,
-                alpn_protocols=['h2', 'http/1.1']
-            )
+            self.ssl_context = tls.get_shared_ssl_context(('h2', 'http/1.1'), self.verify_ssl)
         
         # Set up logging
+        # The logger is shared by every client and scan in the process, so its
+        # level is left to setup_logging and the scan's verbosity
         self.logger = get_logger()
-        self.logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+        # Whether debug output is on; debug messages are only built when it is
+        self._dbg = debug_enabled(self.logger)
         
         # Connection state
         self._connected = False
         self._reader = None
         self._writer = None
         self._h2_conn = None
-        self._response_buffer = bytearray()
         self._stream_id = None
-        self._response_streams = {}
-        self._response_events = {}
-        self._response_data = {}
+        self._streams: Dict[int, _StreamState] = {}
+        # Requests multiplexed on this connection take turns reading from it
+        self._read_lock = asyncio.Lock()
+        # Requests wait for a free slot before opening a stream, so concurrent
+        # callers stay within the server's stream limit; sized on connect
+        self._stream_slots = asyncio.Semaphore(MAX_CONCURRENT_STREAMS)
 
     async def connect(self) -> None:
         """Establish a connection to the target server.
@@ -100,14 +198,20 @@ class HTTP2Client(BaseClient):
         if self._connected:
             return
         
-        self.logger.debug(f"Connecting to {self.host}:{self.port} (TLS: {self.use_tls})")
+        # Drop the socket of a connection that died since the last request
+        if self._writer is not None:
+            await self.close()
+        
+        # Re-check, as the shared logger's level may have changed since __init__
+        self._dbg = debug_enabled(self.logger)
+        self.logger.debug("Connecting to %s:%d (TLS: %s)", self.host, self.port, self.use_tls)
         
         try:
-            # Set up SSL context if needed
+            # Set up SSL context if needed, resuming an earlier session to this target
             ssl_context = None
             if self.use_tls:
-                ssl_context = self.ssl_context
-                self.logger.debug(f"Using TLS with context: {ssl_context}")
+                ssl_context = tls.resumable_context(self.ssl_context, self.host, self.port)
+                self.logger.debug("Using TLS with context: %s", ssl_context)
             
             # Establish connection
             connect_task = asyncio.open_connection(
@@ -122,13 +226,14 @@ class HTTP2Client(BaseClient):
                 connect_task,
                 timeout=self.connect_timeout
             )
+            self._configure_socket()
             
             # Check if we have a TLS connection and if HTTP/2 was negotiated
             if self.use_tls:
                 ssl_object = self._writer.get_extra_info('ssl_object')
                 if ssl_object:
                     protocol = ssl_object.selected_alpn_protocol()
-                    self.logger.debug(f"Negotiated ALPN protocol: {protocol}")
+                    self.logger.debug("Negotiated ALPN protocol: %s", protocol)
                     
                     if protocol != 'h2':
                         if self.force_http2:
@@ -149,7 +254,7 @@ class HTTP2Client(BaseClient):
             self._h2_conn.initiate_connection()
             data = self._h2_conn.data_to_send()
             
-            if self.logger.level <= logging.DEBUG:
+            if self._dbg:
                 self.logger.debug(f"Sending HTTP/2 preface and SETTINGS ({len(data)} bytes)")
                 self.logger.debug(f"Raw data: {data[:50].hex()}" + ("..." if len(data) > 50 else ""))
             
@@ -163,14 +268,15 @@ class HTTP2Client(BaseClient):
                     self._reader.read(65535),
                     timeout=self.connect_timeout
                 )
-                self.logger.debug(f"Received {len(data)} bytes from server")
-                self.logger.debug(f"Raw data: {data[:50].hex()}" + ("..." if len(data) > 50 else ""))
+                if self._dbg:
+                    self.logger.debug(f"Received {len(data)} bytes from server")
+                    self.logger.debug(f"Raw data: {data[:50].hex()}" + ("..." if len(data) > 50 else ""))
                 
                 events = self._h2_conn.receive_data(data)
-                self.logger.debug(f"Received {len(events)} events from server")
-                
-                for event in events:
-                    self.logger.debug(f"Received event: {event}")
+                if self._dbg:
+                    self.logger.debug(f"Received {len(events)} events from server")
+                    for event in events:
+                        self.logger.debug(f"Received event: {event}")
                 
                 # Check for SETTINGS frame
                 settings_found = any(isinstance(event, h2.events.SettingsAcknowledged) 
@@ -183,7 +289,8 @@ class HTTP2Client(BaseClient):
                 # Send any necessary responses (like SETTINGS ACK)
                 data = self._h2_conn.data_to_send()
                 if data:
-                    self.logger.debug(f"Sending response ({len(data)} bytes): {data[:50].hex()}" + ("..." if len(data) > 50 else ""))
+                    if self._dbg:
+                        self.logger.debug(f"Sending response ({len(data)} bytes): {data[:50].hex()}" + ("..." if len(data) > 50 else ""))
                     self._writer.write(data)
                     await self._writer.drain()
                     
@@ -192,6 +299,10 @@ class HTTP2Client(BaseClient):
                 # We'll continue anyway, as some servers might not respond immediately
             
             self.logger.debug("HTTP/2 connection initialized")
+            # A server announcing a limit of 0 still gets one stream at a time
+            self._stream_slots = asyncio.Semaphore(
+                max(1, min(self._h2_conn.remote_settings.max_concurrent_streams, MAX_CONCURRENT_STREAMS))
+            )
             self._connected = True
             self.logger.debug("Connection established successfully")
             return
@@ -200,16 +311,34 @@ class HTTP2Client(BaseClient):
             self.logger.error(f"Connection error: {e}")
             raise ConnectionError(f"Failed to connect to {self.host}:{self.port}: {e}")
     
+    def _configure_socket(self) -> None:
+        """Disable Nagle's algorithm so small HEADERS frames are sent at once.
+        
+        Socket buffer sizes are left to the kernel: setting SO_RCVBUF or
+        SO_SNDBUF explicitly turns off Linux's buffer autotuning.
+        """
+        sock = self._writer.get_extra_info('socket')
+        if sock is None or not hasattr(socket, 'TCP_NODELAY'):
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            self.logger.debug("Could not set socket options: %s", e)
+    
     async def close(self) -> None:
         """Close the connection to the target server."""
-        if not self._connected or not self._writer:
+        # A dead connection still has a socket to close
+        if not self._writer:
             return
             
+        if self.use_tls:
+            tls.store_session(self.ssl_context, self.host, self.port, self._writer.get_extra_info('ssl_object'))
+        
         try:
             self.logger.debug("Closing connection")
             
-            # Send GOAWAY frame if HTTP/2 connection is established
-            if self._h2_conn:
+            # Send GOAWAY frame if the HTTP/2 connection is still up
+            if self._connected and self._h2_conn:
                 self._h2_conn.close_connection()
                 self._writer.write(self._h2_conn.data_to_send())
                 await self._writer.drain()
@@ -217,17 +346,28 @@ class HTTP2Client(BaseClient):
             self._writer.close()
             await self._writer.wait_closed()
         except Exception as e:
-            self.logger.debug(f"Error closing connection: {e}")
+            self.logger.debug("Error closing connection: %s", e)
         finally:
             self._connected = False
             self._reader = None
             self._writer = None
             self._h2_conn = None
             self._stream_id = None
-            self._response_streams.clear()
-            self._response_events.clear()
-            self._response_data.clear()
-            self._response_buffer.clear()
+            self._streams.clear()
+    
+    async def _write_frames(self, frames: List[bytes]) -> None:
+        """Write frames in one go, marking the connection dead if that fails.
+        
+        Args:
+            frames: Serialized HTTP/2 frames
+        """
+        try:
+            # writelines() hands the frames to the socket without joining them first
+            self._writer.writelines(frames)
+            await self._writer.drain()
+        except Exception:
+            self._connected = False
+            raise
     
     async def send_raw(self, data: bytes) -> None:
         """Send raw bytes over the connection.
@@ -239,7 +379,8 @@ class HTTP2Client(BaseClient):
             await self.connect()
             
         try:
-            self.logger.debug(f"Sending {len(data)} bytes")
+            if self._dbg:
+                self.logger.debug(f"Sending {len(data)} bytes")
             self._writer.write(data)
             await self._writer.drain()
         except Exception as e:
@@ -260,12 +401,14 @@ class HTTP2Client(BaseClient):
             raise ConnectionError("Not connected")
             
         try:
-            self.logger.debug(f"Receiving up to {max_size} bytes")
+            if self._dbg:
+                self.logger.debug(f"Receiving up to {max_size} bytes")
             data = await asyncio.wait_for(
                 self._reader.read(max_size),
                 timeout=self.timeout
             )
-            self.logger.debug(f"Received {len(data)} bytes")
+            if self._dbg:
+                self.logger.debug(f"Received {len(data)} bytes")
             return data
         except asyncio.TimeoutError:
             self.logger.error(f"Read timed out after {self.timeout} seconds")
@@ -288,83 +431,98 @@ class HTTP2Client(BaseClient):
             raise ConnectionError("Not connected")
         
         events = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        
+        stream = None
+        if stream_id is not None:
+            stream = self._streams.get(stream_id)
+            if stream is None:
+                stream = self._streams[stream_id] = _StreamState()
         
         try:
-            # Read data with timeout
-            if self.logger.level <= logging.DEBUG:
+            if self._dbg:
                 self.logger.debug(f"Waiting for response on stream {stream_id}...")
             
-            data = await asyncio.wait_for(self._reader.read(65535), timeout=self.timeout)
-            
-            if not data:
-                if self.logger.level <= logging.DEBUG:
-                    self.logger.debug(f"No data received from server, connection may be closed")
-                return events
-            
-            if self.logger.level <= logging.DEBUG:
-                self.logger.debug(f"Received {len(data)} bytes of response data: {data[:50].hex()}" + 
-                      ("..." if len(data) > 50 else ""))
-            
-            # Process the data through h2 connection
-            new_events = self._h2_conn.receive_data(data)
-            if self.logger.level <= logging.DEBUG:
-                self.logger.debug(f"Processed into {len(new_events)} events")
-            for event in new_events:
-                if self.logger.level <= logging.DEBUG:
-                    self.logger.debug(f"Event: {event}")
+            # Read until the stream ends, bounded by one deadline for all reads.
+            # Concurrent requests on this connection read in turn, and each read
+            # routes events to whichever stream they belong to.
+            while stream is None or not stream.ended:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                async with asyncio.timeout(remaining):
+                    async with self._read_lock:
+                        # Another request may have read our stream's end meanwhile
+                        if stream is not None and stream.ended:
+                            break
+                        data = await self._reader.read(65535)
                 
-            events.extend(new_events)
-            
-            # Save events and data for the specific stream if requested
-            if stream_id is not None:
-                self._response_events.setdefault(stream_id, []).extend(
-                    [e for e in new_events if hasattr(e, 'stream_id') and e.stream_id == stream_id]
-                )
+                if not data:
+                    if self._dbg:
+                        self.logger.debug(f"No data received from server, connection is closed")
+                    self._connected = False
+                    break
                 
-                # Extract data from DATA frames for this stream
+                if self._dbg:
+                    self.logger.debug(f"Received {len(data)} bytes of response data: {data[:50].hex()}" + 
+                          ("..." if len(data) > 50 else ""))
+                
+                # Process the data through h2 connection
+                new_events = self._h2_conn.receive_data(data)
+                if self._dbg:
+                    self.logger.debug(f"Processed into {len(new_events)} events")
+                    for event in new_events:
+                        self.logger.debug(f"Event: {event}")
+                    
+                events.extend(new_events)
+                
+                # Save events and data for the streams awaiting a response,
+                # in a single pass over the new events
                 for event in new_events:
-                    if (isinstance(event, h2.events.DataReceived) and 
-                        event.stream_id == stream_id):
-                        self._response_data.setdefault(stream_id, bytearray()).extend(event.data)
+                    event_type = type(event)
+                    if event_type is h2.events.DataReceived:
+                        # Hand the flow-control window back, or bodies past the
+                        # initial 64 KiB window stall every stream on the connection
+                        self._h2_conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif event_type is h2.events.ConnectionTerminated:
+                        # GOAWAY: no new streams, and streams above the last
+                        # one the server processed will never be answered
+                        self._connected = False
+                        for other_id, other_stream in self._streams.items():
+                            if event.last_stream_id is None or other_id > event.last_stream_id:
+                                other_stream.ended = True
                     
-                    # Mark if the stream is ended
-                    if ((isinstance(event, h2.events.StreamEnded) or 
-                         isinstance(event, h2.events.StreamReset)) and 
-                        event.stream_id == stream_id):
-                        self._response_streams[stream_id] = True
-            
-            # Handle any necessary responses
-            response_data = self._h2_conn.data_to_send()
-            if response_data:
-                self._writer.write(response_data)
-                await self._writer.drain()
-            
-            # If we're waiting for a specific stream and it hasn't ended yet,
-            # try to read more data
-            if (stream_id is not None and 
-                not self._response_streams.get(stream_id, False) and 
-                not any(isinstance(e, h2.events.StreamEnded) for e in events if hasattr(e, 'stream_id') and e.stream_id == stream_id)):
+                    event_stream = self._streams.get(getattr(event, 'stream_id', None))
+                    if event_stream is None:
+                        continue
+                    
+                    # Decode response headers, collect DATA payloads and
+                    # mark ended or reset streams
+                    handler = _STREAM_EVENT_HANDLERS.get(event_type)
+                    if handler is not None:
+                        handler(event_stream, event)
                 
-                # Recursively call to get more data until stream ends or timeout
-                try:
-                    more_events = await asyncio.wait_for(
-                        self._process_incoming_data(stream_id),
-                        timeout=self.timeout
-                    )
-                    events.extend(more_events)
-                except asyncio.TimeoutError:
-                    if self.logger.level <= logging.DEBUG:
-                        self.logger.debug(f"Timeout waiting for stream {stream_id} to end, proceeding anyway")
-                    pass
+                # Handle any necessary responses
+                response_data = self._h2_conn.data_to_send()
+                if response_data:
+                    await self._write_frames([response_data])
+                
+                # Without a stream to wait for, a single read is enough
+                if stream is None:
+                    break
                     
         except asyncio.TimeoutError:
-            if self.logger.level <= logging.DEBUG:
-                self.logger.debug(f"Timeout waiting for server response after {self.timeout}s")
+            if self._dbg:
+                if events:
+                    self.logger.debug(f"Timeout waiting for stream {stream_id} to end, proceeding anyway")
+                else:
+                    self.logger.debug(f"Timeout waiting for server response after {self.timeout}s")
         except ConnectionError as e:
-            if self.logger.level <= logging.DEBUG:
+            if self._dbg:
                 self.logger.debug(f"Connection error: {e}")
         except Exception as e:
-            if self.logger.level <= logging.DEBUG:
+            if self._dbg:
                 self.logger.debug(f"Error processing incoming data: {e}")
         
         return events
@@ -373,7 +531,7 @@ class HTTP2Client(BaseClient):
         self, 
         method: str, 
         path: str, 
-        headers: List[Tuple[str, str]], 
+        headers: List[Tuple[Union[str, bytes], Union[str, bytes]]], 
         body: Optional[bytes] = None,
         raw_request: Optional[bytes] = None,
     ) -> Tuple[Dict[str, Any], bytes]:
@@ -382,7 +540,8 @@ class HTTP2Client(BaseClient):
         Args:
             method: HTTP method (GET, POST, etc.)
             path: Request path
-            headers: List of (name, value) header tuples
+            headers: List of (name, value) header tuples; names and values may
+                also be pre-encoded bytes, which HPACK takes without encoding
             body: Request body as bytes
             raw_request: Not used for HTTP/2, included for compatibility
             
@@ -396,118 +555,88 @@ class HTTP2Client(BaseClient):
         if not self._h2_conn:
             raise ConnectionError("HTTP/2 connection not established")
         
-        # Create a new stream
-        stream_id = self._h2_conn.get_next_available_stream_id()
-        self._stream_id = stream_id
-        
-        # Clear previous response data for this stream
-        self._response_events[stream_id] = []
-        self._response_data[stream_id] = bytearray()
-        self._response_streams[stream_id] = False
-        
-        # Prepare headers
-        h2_headers = [
-            (':method', method),
-            (':path', path),
-            (':scheme', 'https' if self.use_tls else 'http'),
-            (':authority', f"{self.host}:{self.port}"),
-        ]
-        
-        # Add custom headers
-        for name, value in headers:
-            h2_headers.append((name.lower(), value))
-        
-        # Log the request with more detail if verbose
-        if self.logger.level <= logging.DEBUG:
-            self.logger.debug("\n==== HTTP/2 REQUEST FRAMES ====")
-            self.logger.debug(f"STREAM ID: {stream_id}")
-            self.logger.debug("HEADERS FRAME:")
-            for name, value in h2_headers:
-                self.logger.debug(f"  {name}: {value}")
-            if body:
-                self.logger.debug(f"DATA FRAME: {len(body)} bytes")
-                self.logger.debug(f"DATA: {body[:100].hex()}" + ("..." if len(body) > 100 else ""))
-        
-        # When verbose mode is enabled (-v flag), log the complete raw request
-        # This is different from DEBUG level logging and is controlled by the verbose flag
-        if hasattr(self, 'verbose') and self.verbose:
-            self.logger.info(f"\n==== COMPLETE HTTP/2 REQUEST ====")
-            self.logger.info(f"Target: {self.host}:{self.port}")
-            self.logger.info(f"Stream ID: {stream_id}")
-            self.logger.info("Headers:")
-            for name, value in h2_headers:
-                self.logger.info(f"  {name}: {value}")
-            if body:
-                self.logger.info(f"Body ({len(body)} bytes):")
-                try:
-                    body_str = body.decode('utf-8')
-                    self.logger.info(f"  {body_str}")
-                except UnicodeDecodeError:
-                    self.logger.info(f"  [Binary data: {body.hex()}]")
-        
-        # Record start time for timing measurements
-        start_time = time.time()
-        
-        # Send headers
-        self._h2_conn.send_headers(stream_id, h2_headers, end_stream=not body)
-        header_data = self._h2_conn.data_to_send()
-        
-        if self.logger.level <= logging.DEBUG:
-            self.logger.debug(f"RAW HEADERS FRAME: {header_data[:50].hex()}" + ("..." if len(header_data) > 50 else ""))
-        
-        self._writer.write(header_data)
-        await self._writer.drain()
-        
-        # Send body if provided
-        if body:
-            self._h2_conn.send_data(stream_id, body, end_stream=True)
-            body_data = self._h2_conn.data_to_send()
+        # Open a new stream once the server's stream limit allows it;
+        # it is cleaned up however the request ends
+        async with self._open_stream() as stream_id:
+            # Prepare pseudo-headers followed by the custom headers
+            h2_headers = [
+                (':method', method),
+                (':path', path),
+                self._scheme_header,
+                self._authority_header,
+                *[(_lower(name), value) for name, value in headers],
+            ]
+            
+            # Log the request with more detail if verbose
+            if self._dbg:
+                self.logger.debug("\n==== HTTP/2 REQUEST FRAMES ====")
+                self.logger.debug(f"STREAM ID: {stream_id}")
+                self.logger.debug("HEADERS FRAME:")
+                for name, value in h2_headers:
+                    self.logger.debug(f"  {name}: {value}")
+                if body:
+                    self.logger.debug(f"DATA FRAME: {len(body)} bytes")
+                    self.logger.debug(f"DATA: {body[:100].hex()}" + ("..." if len(body) > 100 else ""))
+            
+            # When verbose mode is enabled (-v flag), log the complete raw request
+            # This is different from DEBUG level logging and is controlled by the verbose flag
+            if hasattr(self, 'verbose') and self.verbose:
+                self.logger.info(f"\n==== COMPLETE HTTP/2 REQUEST ====")
+                self.logger.info(f"Target: {self.host}:{self.port}")
+                self.logger.info(f"Stream ID: {stream_id}")
+                self.logger.info("Headers:")
+                for name, value in h2_headers:
+                    self.logger.info(f"  {name}: {value}")
+                if body:
+                    self.logger.info(f"Body ({len(body)} bytes):")
+                    try:
+                        body_str = body.decode('utf-8')
+                        self.logger.info(f"  {body_str}")
+                    except UnicodeDecodeError:
+                        self.logger.info(f"  [Binary data: {body.hex()}]")
             
-            if self.logger.level <= logging.DEBUG:
-                self.logger.debug(f"RAW DATA FRAME: {body_data[:50].hex()}" + ("..." if len(body_data) > 50 else ""))
+            # Record start time for timing measurements
+            start_time = time.time()
             
-            self._writer.write(body_data)
-            await self._writer.drain()
-        
-        # Wait for response with timeout
-        response_received = False
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                # Process incoming data
-                events = await asyncio.wait_for(
-                    self._process_incoming_data(stream_id),
-                    timeout=self.timeout / max_attempts
-                )
+            # Send headers
+            self._h2_conn.send_headers(stream_id, h2_headers, end_stream=not body)
+            header_data = self._h2_conn.data_to_send()
+            request_frames = [header_data]
+            
+            if self._dbg:
+                self.logger.debug(f"RAW HEADERS FRAME: {header_data[:50].hex()}" + ("..." if len(header_data) > 50 else ""))
+            
+            # Send body if provided, in the same write as the headers
+            if body:
+                self._h2_conn.send_data(stream_id, body, end_stream=True)
+                body_data = self._h2_conn.data_to_send()
                 
-                # Check if we received a response
-                for event in events:
-                    if isinstance(event, h2.events.ResponseReceived) and event.stream_id == stream_id:
-                        response_received = True
-                        break
+                if self._dbg:
+                    self.logger.debug(f"RAW DATA FRAME: {body_data[:50].hex()}" + ("..." if len(body_data) > 50 else ""))
                 
-                if response_received:
-                    break
-                    
-            except asyncio.TimeoutError:
-                self.logger.debug(f"Timeout waiting for response (attempt {attempt+1}/{max_attempts})")
-                continue
-        
-        # Try to parse response even if we didn't receive a complete response
-        response_info, response_body = self._parse_response(stream_id)
-        
-        # Record end time
-        end_time = time.time()
-        response_info['response_time'] = end_time - start_time
-        
-        # Log the response
-        self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
-        for name, value in response_info.get('headers', []):
-            self.logger.debug(f"  {name}: {value}")
-        if response_body:
-            self.logger.debug(f"  Body: {len(response_body)} bytes")
-        
-        return response_info, response_body
+                request_frames.append(body_data)
+            
+            await self._write_frames(request_frames)
+            
+            # Wait for response; reads until the stream ends or the timeout passes
+            await self._process_incoming_data(stream_id)
+            
+            # Try to parse response even if we didn't receive a complete response
+            response_info, response_body = self._parse_response(stream_id)
+            
+            # Record end time
+            end_time = time.time()
+            response_info['response_time'] = end_time - start_time
+            
+            # Log the response
+            if self._dbg:
+                self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
+                for name, value in response_info.get('headers', []):
+                    self.logger.debug(f"  {name}: {value}")
+                if response_body:
+                    self.logger.debug(f"  Body: {len(response_body)} bytes")
+            
+            return response_info, response_body
     
     async def send_malformed_headers(
         self,
@@ -540,104 +669,96 @@ class HTTP2Client(BaseClient):
         if not self._h2_conn:
             raise ConnectionError("HTTP/2 connection not established")
         
-        # Create a new stream
-        stream_id = self._h2_conn.get_next_available_stream_id()
-        self._stream_id = stream_id
-        
-        # Clear previous response data for this stream
-        self._response_events[stream_id] = []
-        self._response_data[stream_id] = bytearray()
-        self._response_streams[stream_id] = False
-        
-        # Prepare headers
-        h2_headers = []
-        
-        # Add standard pseudo-headers
-        h2_headers.append((':method', method))
-        h2_headers.append((':path', path))
-        h2_headers.append((':scheme', 'https' if self.use_tls else 'http'))
-        h2_headers.append((':authority', f"{self.host}:{self.port}"))
-        
-        # Add custom pseudo-headers if provided (can be duplicates)
-        if pseudo_headers:
-            h2_headers.extend(pseudo_headers)
-        
-        # Add custom headers
-        for name, value in headers:
-            if name.startswith(':'):
-                # This is a pseudo-header, check if it already exists
-                replaced = False
-                for i, (header_name, _) in enumerate(h2_headers):
-                    if header_name == name:
-                        # Replace the existing pseudo-header
+        # Open a new stream once the server's stream limit allows it;
+        # it is cleaned up however the request ends
+        async with self._open_stream() as stream_id:
+            # Prepare headers, starting with the standard pseudo-headers
+            h2_headers = [
+                (':method', method),
+                (':path', path),
+                self._scheme_header,
+                self._authority_header,
+            ]
+            
+            # Add custom pseudo-headers if provided (can be duplicates)
+            if pseudo_headers:
+                h2_headers.extend(pseudo_headers)
+            
+            # Position of the first occurrence of each pseudo-header
+            pseudo_index: Dict[str, int] = {}
+            for i, (header_name, _) in enumerate(h2_headers):
+                if header_name.startswith(':'):
+                    pseudo_index.setdefault(header_name, i)
+            
+            # Add custom headers
+            for name, value in headers:
+                if name.startswith(':'):
+                    # This is a pseudo-header; replace the existing one if present
+                    i = pseudo_index.get(name)
+                    if i is not None:
                         h2_headers[i] = (name, value)
-                        replaced = True
-                        break
-                # If not replaced, add it as a new pseudo-header
-                if not replaced:
-                    h2_headers.append((name, value))
-            else:
-                # Regular header, just add it
-                h2_headers.append((name.lower(), value))
-        
-        # Log the complete request headers including pseudo-headers
-        if self.logger.level <= logging.DEBUG:
-            self.logger.debug(f"\n==== COMPLETE HTTP/2 REQUEST HEADERS ====")
-            self.logger.debug(f"STREAM ID: {stream_id}")
-            for name, value in h2_headers:
-                self.logger.debug(f"  {name}: {value}")
-            if body:
-                self.logger.debug(f"  Body: {len(body)} bytes")
-                self.logger.debug(f"  Body content: {body[:100].decode('utf-8', errors='replace')}" + ("..." if len(body) > 100 else ""))
-        else:
-            # When verbose mode is enabled (-v flag), log the complete raw request
-            # This is different from DEBUG level logging and is controlled by the verbose flag
-            if hasattr(self, 'verbose') and self.verbose:
-                self.logger.info(f"\n==== COMPLETE HTTP/2 REQUEST ====")
-                self.logger.info(f"Target: {self.host}:{self.port}")
-                self.logger.info(f"Stream ID: {stream_id}")
-                self.logger.info("Headers:")
+                    else:
+                        # If not replaced, add it as a new pseudo-header
+                        pseudo_index[name] = len(h2_headers)
+                        h2_headers.append((name, value))
+                else:
+                    # Regular header, just add it
+                    h2_headers.append((_lower(name), value))
+            
+            # Log the complete request headers including pseudo-headers
+            if self._dbg:
+                self.logger.debug(f"\n==== COMPLETE HTTP/2 REQUEST HEADERS ====")
+                self.logger.debug(f"STREAM ID: {stream_id}")
                 for name, value in h2_headers:
-                    self.logger.info(f"  {name}: {value}")
+                    self.logger.debug(f"  {name}: {value}")
                 if body:
-                    self.logger.info(f"Body ({len(body)} bytes):")
-                    try:
-                        body_str = body.decode('utf-8')
-                        self.logger.info(f"  {body_str}")
-                    except UnicodeDecodeError:
-                        self.logger.info(f"  [Binary data: {body.hex()}]")
-        
-        # Record start time for timing measurements
-        start_time = time.time()
-        
-        # Send headers
-        self._h2_conn.send_headers(stream_id, h2_headers, end_stream=not body and end_stream)
-        self._writer.write(self._h2_conn.data_to_send())
-        await self._writer.drain()
-        
-        # Send body if provided
-        if body:
-            self._h2_conn.send_data(stream_id, body, end_stream=end_stream)
-            self._writer.write(self._h2_conn.data_to_send())
-            await self._writer.drain()
-        
-        # Wait for response
-        await self._process_incoming_data(stream_id)
-        
-        # Parse response
-        response_info, response_body = self._parse_response(stream_id)
-        
-        # Record end time
-        end_time = time.time()
-        response_info['response_time'] = end_time - start_time
-        
-        # Log the response
-        self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
-        for name, value in response_info.get('headers', []):
-            self.logger.debug(f"  {name}: {value}")
-        self.logger.debug(f"  Body: {len(response_body)} bytes")
-        
-        return response_info, response_body
+                    self.logger.debug(f"  Body: {len(body)} bytes")
+                    self.logger.debug(f"  Body content: {body[:100].decode('utf-8', errors='replace')}" + ("..." if len(body) > 100 else ""))
+            else:
+                # When verbose mode is enabled (-v flag), log the complete raw request
+                # This is different from DEBUG level logging and is controlled by the verbose flag
+                if hasattr(self, 'verbose') and self.verbose:
+                    self.logger.info(f"\n==== COMPLETE HTTP/2 REQUEST ====")
+                    self.logger.info(f"Target: {self.host}:{self.port}")
+                    self.logger.info(f"Stream ID: {stream_id}")
+                    self.logger.info("Headers:")
+                    for name, value in h2_headers:
+                        self.logger.info(f"  {name}: {value}")
+                    if body:
+                        self.logger.info(f"Body ({len(body)} bytes):")
+                        try:
+                            body_str = body.decode('utf-8')
+                            self.logger.info(f"  {body_str}")
+                        except UnicodeDecodeError:
+                            self.logger.info(f"  [Binary data: {body.hex()}]")
+            
+            # Record start time for timing measurements
+            start_time = time.time()
+            
+            # Queue headers and body (if provided), then send both frames in one write
+            self._h2_conn.send_headers(stream_id, h2_headers, end_stream=not body and end_stream)
+            if body:
+                self._h2_conn.send_data(stream_id, body, end_stream=end_stream)
+            await self._write_frames([self._h2_conn.data_to_send()])
+            
+            # Wait for response
+            await self._process_incoming_data(stream_id)
+            
+            # Parse response
+            response_info, response_body = self._parse_response(stream_id)
+            
+            # Record end time
+            end_time = time.time()
+            response_info['response_time'] = end_time - start_time
+            
+            # Log the response
+            if self._dbg:
+                self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
+                for name, value in response_info.get('headers', []):
+                    self.logger.debug(f"  {name}: {value}")
+                self.logger.debug(f"  Body: {len(response_body)} bytes")
+            
+            return response_info, response_body
     
     async def send_padded_data(
         self,
@@ -670,91 +791,116 @@ class HTTP2Client(BaseClient):
         if not self._h2_conn:
             raise ConnectionError("HTTP/2 connection not established")
         
-        # Create a new stream
-        stream_id = self._h2_conn.get_next_available_stream_id()
-        self._stream_id = stream_id
-        
-        # Clear previous response data for this stream
-        self._response_events[stream_id] = []
-        self._response_data[stream_id] = bytearray()
-        self._response_streams[stream_id] = False
-        
-        # Prepare headers
-        h2_headers = [
-            (':method', method),
-            (':path', path),
-            (':scheme', 'https' if self.use_tls else 'http'),
-            (':authority', f"{self.host}:{self.port}"),
-        ]
-        
-        # Add custom headers
-        for name, value in headers:
-            h2_headers.append((name.lower(), value))
-        
-        # Log the request
-        self.logger.debug(f"Sending padded data request to {path} (stream_id={stream_id})")
-        self.logger.debug(f"  Body: {len(body)} bytes, Padding: {padding_length} bytes")
-        for name, value in h2_headers:
-            self.logger.debug(f"  {name}: {value}")
-        
-        # When verbose mode is enabled (-v flag), log the complete raw request
-        # This is different from DEBUG level logging and is controlled by the verbose flag
-        if hasattr(self, 'verbose') and self.verbose:
-            self.logger.info(f"\n==== COMPLETE HTTP/2 REQUEST WITH PADDING ====")
-            self.logger.info(f"Target: {self.host}:{self.port}")
-            self.logger.info(f"Stream ID: {stream_id}")
-            self.logger.info(f"Padding length: {padding_length} bytes")
-            self.logger.info("Headers:")
-            for name, value in h2_headers:
-                self.logger.info(f"  {name}: {value}")
-            self.logger.info(f"Body ({len(body)} bytes):")
-            try:
-                body_str = body.decode('utf-8')
-                self.logger.info(f"  {body_str}")
-            except UnicodeDecodeError:
-                self.logger.info(f"  [Binary data: {body.hex()}]")
-        
-        # Record start time for timing measurements
-        start_time = time.time()
-        
-        # Send headers
-        self._h2_conn.send_headers(stream_id, h2_headers, end_stream=not body)
-        self._writer.write(self._h2_conn.data_to_send())
-        await self._writer.drain()
-        
-        # Send body with padding if provided
-        if body:
-            # We need to manually create a DATA frame with padding since h2 doesn't expose this directly
-            from h2.frame_buffer import FrameBuffer
-            from h2.frames import DataFrame
+        # Open a new stream once the server's stream limit allows it;
+        # it is cleaned up however the request ends
+        async with self._open_stream() as stream_id:
+            # Prepare pseudo-headers followed by the custom headers
+            h2_headers = [
+                (':method', method),
+                (':path', path),
+                self._scheme_header,
+                self._authority_header,
+                *[(_lower(name), value) for name, value in headers],
+            ]
+            
+            # Log the request
+            if self._dbg:
+                self.logger.debug(f"Sending padded data request to {path} (stream_id={stream_id})")
+                self.logger.debug(f"  Body: {len(body)} bytes, Padding: {padding_length} bytes")
+                for name, value in h2_headers:
+                    self.logger.debug(f"  {name}: {value}")
             
-            # Create a DATA frame with padding
-            frame = DataFrame(stream_id=stream_id, data=body, pad_length=padding_length, flags=['END_STREAM'] if end_stream else [])
+            # When verbose mode is enabled (-v flag), log the complete raw request
+            # This is different from DEBUG level logging and is controlled by the verbose flag
+            if hasattr(self, 'verbose') and self.verbose:
+                self.logger.info(f"\n==== COMPLETE HTTP/2 REQUEST WITH PADDING ====")
+                self.logger.info(f"Target: {self.host}:{self.port}")
+                self.logger.info(f"Stream ID: {stream_id}")
+                self.logger.info(f"Padding length: {padding_length} bytes")
+                self.logger.info("Headers:")
+                for name, value in h2_headers:
+                    self.logger.info(f"  {name}: {value}")
+                self.logger.info(f"Body ({len(body)} bytes):")
+                try:
+                    body_str = body.decode('utf-8')
+                    self.logger.info(f"  {body_str}")
+                except UnicodeDecodeError:
+                    self.logger.info(f"  [Binary data: {body.hex()}]")
             
-            # Serialize the frame
-            frame_data = frame.serialize()
+            # Record start time for timing measurements
+            start_time = time.time()
             
-            # Send the raw frame data
-            await self.send_raw(frame_data)
-        
-        # Wait for response
-        await self._process_incoming_data(stream_id)
-        
-        # Parse response
-        response_info, response_body = self._parse_response(stream_id)
-        
-        # Record end time
-        end_time = time.time()
-        response_info['response_time'] = end_time - start_time
+            # Queue headers
+            self._h2_conn.send_headers(stream_id, h2_headers, end_stream=not body)
+            request_frames = [self._h2_conn.data_to_send()]
+            
+            # Append body with padding if provided
+            if body:
+                # We need to manually create a DATA frame with padding since h2 doesn't expose this directly
+                request_frames.append(_padded_data_frame(stream_id, body, padding_length, end_stream))
+            
+            # Send the headers and raw frame data in one write
+            await self._write_frames(request_frames)
+            
+            # Wait for response
+            await self._process_incoming_data(stream_id)
+            
+            # Parse response
+            response_info, response_body = self._parse_response(stream_id)
+            
+            # Record end time
+            end_time = time.time()
+            response_info['response_time'] = end_time - start_time
+            
+            # Log the response
+            if self._dbg:
+                self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
+                for name, value in response_info.get('headers', []):
+                    self.logger.debug(f"  {name}: {value}")
+                self.logger.debug(f"  Body: {len(response_body)} bytes")
+            
+            return response_info, response_body
+
+    @contextlib.asynccontextmanager
+    async def _open_stream(self) -> AsyncIterator[int]:
+        """Reserve a stream slot and register a new stream for one request.
         
-        # Log the response
-        self.logger.debug(f"Received response: {response_info['status_code']} ({response_info['response_time']:.6f}s)")
-        for name, value in response_info.get('headers', []):
-            self.logger.debug(f"  {name}: {value}")
-        self.logger.debug(f"  Body: {len(response_body)} bytes")
+        Waits at most timeout seconds for a slot. On leaving, whether the
+        request completed, failed or was cancelled, the slot is released,
+        the stream's response state is dropped, and a stream that is still
+        open is reset so it no longer counts against the server's limit.
         
-        return response_info, response_body
-
+        Yields:
+            ID of the new stream
+        """
+        # Keep the semaphore the slot came from; a reconnect replaces it
+        slots = self._stream_slots
+        await asyncio.wait_for(slots.acquire(), timeout=self.timeout)
+        stream_id = None
+        try:
+            stream_id = self._h2_conn.get_next_available_stream_id()
+            self._stream_id = stream_id
+            self._streams[stream_id] = _StreamState()
+            yield stream_id
+        finally:
+            slots.release()
+            if stream_id is not None:
+                self._streams.pop(stream_id, None)
+                self._reset_open_stream(stream_id)
+    
+    def _reset_open_stream(self, stream_id: int) -> None:
+        """Send RST_STREAM for a stream that has not closed yet."""
+        if self._h2_conn is None or self._writer is None or self._writer.is_closing():
+            return
+        h2_stream = self._h2_conn.streams.get(stream_id)
+        if h2_stream is None or h2_stream.closed:
+            return
+        try:
+            self._h2_conn.reset_stream(stream_id, error_code=h2.errors.ErrorCodes.CANCEL)
+        except h2.exceptions.ProtocolError:
+            return
+        self._writer.write(self._h2_conn.data_to_send())
+    
     def _parse_response(self, stream_id: int) -> Tuple[Dict[str, Any], bytes]:
         """Parse an HTTP/2 response.
         
@@ -764,27 +910,108 @@ class HTTP2Client(BaseClient):
         Returns:
             Tuple of (response_info, response_body)
         """
+        # The response headers were already decoded as they arrived
+        stream = self._streams.get(stream_id) or _StreamState()
         response_info = {
-            'status_code': None,
-            'headers': [],
+            'status_code': stream.status_code,
+            'headers': stream.headers,
         }
         
-        events = self._response_events.get(stream_id, [])
-        
-        # Extract headers from HeadersReceived events
-        for event in events:
-            if isinstance(event, h2.events.ResponseReceived):
-                for name, value in event.headers:
-                    # Convert byte strings to regular strings
-                    name_str = name.decode('utf-8') if isinstance(name, bytes) else name
-                    value_str = value.decode('utf-8') if isinstance(value, bytes) else value
-                    
-                    if name_str == ':status':
-                        response_info['status_code'] = int(value_str)
-                    elif not name_str.startswith(':'):
-                        response_info['headers'].append((name_str, value_str))
-        
         # Get response body
-        response_body = bytes(self._response_data.get(stream_id, b''))
+        response_body = b"".join(stream.chunks)
         
         return response_info, response_body
+
+
+class HTTP2ClientPool:
+    """Shares one connected HTTP2Client per target across requests.
+    
+    HTTP/2 multiplexes requests as separate streams, so callers are not
+    serialized: concurrent requests on a shared client each get their own
+    stream ID. Only connecting is done one caller at a time per target.
+    When the pool is full, only a client no caller is using is evicted.
+    
+    Example:
+        async with pool.acquire(host, port) as client:
+            response_info, body = await client.send_request("GET", "/", headers)
+    """
+    
+    def __init__(self, max_clients: int = 20, **client_options: Any) -> None:
+        """Initialize an empty pool.
+        
+        Args:
+            max_clients: Maximum number of targets to keep connections to
+            **client_options: Keyword arguments for each HTTP2Client
+        """
+        self.max_clients = max_clients
+        self.client_options = client_options
+        self._clients: Dict[Tuple[str, int, bool], HTTP2Client] = {}
+        self._locks: Dict[Tuple[str, int, bool], asyncio.Lock] = {}
+        # Callers currently inside acquire() per target
+        self._users: Dict[Tuple[str, int, bool], int] = {}
+    
+    @contextlib.asynccontextmanager
+    async def acquire(self, host: str, port: int, use_tls: bool = True) -> AsyncIterator[HTTP2Client]:
+        """Get the shared, connected client for a target.
+        
+        Args:
+            host: Target hostname or IP address
+            port: Target port
+            use_tls: Whether to use TLS (HTTPS)
+            
+        Yields:
+            Connected HTTP2Client
+        """
+        key = (host, port, use_tls)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            client = self._clients.get(key)
+            if client is None or not client.is_connected:
+                if client is None:
+                    # Shrink back below max_clients once callers have let go
+                    while len(self._clients) >= self.max_clients and await self._evict_idle():
+                        pass
+                else:
+                    # The server closed or sent GOAWAY; release its socket
+                    await client.close()
+                client = HTTP2Client(host, port, use_tls, **self.client_options)
+                await client.connect()
+                self._clients[key] = client
+            self._users[key] = self._users.get(key, 0) + 1
+        try:
+            yield client
+        finally:
+            users = self._users[key] - 1
+            if users:
+                self._users[key] = users
+            else:
+                del self._users[key]
+    
+    async def _evict_idle(self) -> bool:
+        """Close the least recently added client that no caller is using.
+        
+        If every client is in use, nothing is evicted and the pool grows
+        past max_clients until one becomes idle.
+        
+        Returns:
+            True if a client was evicted
+        """
+        for key in self._clients:
+            if key not in self._users:
+                break
+        else:
+            return False
+        client = self._clients.pop(key)
+        # Nobody is waiting on an unlocked lock, so a later caller can start afresh
+        lock = self._locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._locks[key]
+        await client.close()
+        return True
+    
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.close()
@@ -15,7 +15,7 @@ import sys
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
-from src.clients.http2 import HTTP2Client
+from src.clients.http2 import HTTP2ClientPool
 from src.utils.logging import get_logger, setup_logging
 
 logger = get_logger()
@@ -85,11 +85,8 @@ async def test_h2_cl_vulnerability(
         'errors': [],
     }
     
-    # Initialize HTTP/2 client
-    client = HTTP2Client(
-        host=host,
-        port=port,
-        use_tls=use_tls,
+    # Requests share one HTTP/2 connection, each on its own stream
+    pool = HTTP2ClientPool(
         verify_ssl=False,  # We handle verification ourselves
         timeout=timeout,
         force_http2=True,  # Try to force HTTP/2 even if not advertised in ALPN
@@ -98,7 +95,8 @@ async def test_h2_cl_vulnerability(
     
     try:
         # Connect to the server
-        await client.connect()
+        async with pool.acquire(host, port, use_tls):
+            pass
         
         # Define default request headers
         request_headers = [
@@ -116,11 +114,12 @@ async def test_h2_cl_vulnerability(
         logger.info("Sending baseline request...")
         start_baseline = time.time()
         try:
-            baseline_response, _ = await client.send_request(
-                method="GET",
-                path=path,
-                headers=request_headers,
-            )
+            async with pool.acquire(host, port, use_tls) as client:
+                baseline_response, _ = await client.send_request(
+                    method="GET",
+                    path=path,
+                    headers=request_headers,
+                )
             end_baseline = time.time()
             baseline_response_time = end_baseline - start_baseline
             logger.info(f"Baseline response time: {baseline_response_time:.6f}s")
@@ -186,128 +185,118 @@ async def test_h2_cl_vulnerability(
                 header_value = mutation["header_value"]
                 mutation_type = mutation["type"]
                 
-                # Create a fresh HTTP/2 client for each test
-                client = HTTP2Client(
-                    host=host,
-                    port=port,
-                    use_tls=use_tls,
-                    verify_ssl=False,
-                    timeout=timeout,
-                    force_http2=True,
-                    verbose=verbose,
-                )
-                
+                # Each test gets its own stream on the shared connection,
+                # reconnecting if an earlier test made the server drop it
                 try:
-                    await client.connect()
-                    
-                    # Prepare test headers based on mutation type
-                    test_headers = request_headers.copy()
-                    
-                    # Actual detection logic depends on payload placement
-                    # Here we're testing Content-Length vulnerabilities
-                    body_content = "abc"  # lowercase, as requested for proper testing
-                    
-                    if payload_placement == "normal_header":
-                        # Add Content-Length header with a value larger than the actual body
-                        test_headers.append((header_name, header_value))
+                    async with pool.acquire(host, port, use_tls) as client:
+                        # Prepare test headers based on mutation type
+                        test_headers = request_headers.copy()
                         
-                        if verbose:
-                            logger.info(f"\n==== TEST REQUEST DETAILS ====")
-                            logger.info(f"Headers:")
-                            for name, value in test_headers:
-                                logger.info(f"  {name}: {value}")
-                            logger.info(f"Body: '{body_content}' ({len(body_content)} bytes)")
-                            logger.info(f"Content-Length header value: {header_value} (should be > {len(body_content)})")
+                        # Actual detection logic depends on payload placement
+                        # Here we're testing Content-Length vulnerabilities
+                        body_content = "abc"  # lowercase, as requested for proper testing
                         
-                        # The key part of the test: if the backend is using the
-                        # Content-Length from our request but we're sending less data,
-                        # it should wait for the rest of the data, causing a timeout
-                        # or delay that we can detect.
+                        if payload_placement == "normal_header":
+                            # Add Content-Length header with a value larger than the actual body
+                            test_headers.append((header_name, header_value))
+                            
+                            if verbose:
+                                logger.info(f"\n==== TEST REQUEST DETAILS ====")
+                                logger.info(f"Headers:")
+                                for name, value in test_headers:
+                                    logger.info(f"  {name}: {value}")
+                                logger.info(f"Body: '{body_content}' ({len(body_content)} bytes)")
+                                logger.info(f"Content-Length header value: {header_value} (should be > {len(body_content)})")
+                            
+                            # The key part of the test: if the backend is using the
+                            # Content-Length from our request but we're sending less data,
+                            # it should wait for the rest of the data, causing a timeout
+                            # or delay that we can detect.
+                            
+                        elif payload_placement == "custom_header_value":
+                            # Content-Length in a custom header value position
+                            test_headers.append((header_name, header_value))
+                        elif payload_placement == "custom_header_name":
+                            # Content-Length in a custom header name position
+                            test_headers.append((header_name, header_value))
+                        elif payload_placement == "request_line":
+                            # Content-Length in a request line position
+                            test_headers.append((header_name, header_value))
                         
-                    elif payload_placement == "custom_header_value":
-                        # Content-Length in a custom header value position
-                        test_headers.append((header_name, header_value))
-                    elif payload_placement == "custom_header_name":
-                        # Content-Length in a custom header name position
-                        test_headers.append((header_name, header_value))
-                    elif payload_placement == "request_line":
-                        # Content-Length in a request line position
-                        test_headers.append((header_name, header_value))
-                    
-                    # Record start time
-                    start_time = time.time()
-                    
-                    # Use send_malformed_headers for all tests to ensure headers are sent exactly as specified
-                    test_response, _ = await client.send_malformed_headers(
-                        method="POST",
-                        path=path,
-                        headers=test_headers,
-                        body=body_content.encode(),
-                    )
-                    
-                    # Record end time and calculate response time
-                    end_time = time.time()
-                    response_time = end_time - start_time
-                    
-                    # Log response details for debugging
-                    if verbose:
-                        logger.info(f"Response Status: {test_response.get('status_code')}")
-                        logger.info(f"Response Time: {response_time:.6f}s")
-                        logger.info(f"Baseline Response Time: {baseline_response_time:.6f}s")
-                        logger.info(f"Time Difference: {response_time - baseline_response_time:.6f}s")
-                        logger.info(f"Ratio: {response_time / baseline_response_time:.2f}x")
-                    
-                    # A vulnerability is detected if the response time is significantly longer
-                    # than the baseline (indicating the server was waiting for more data)
-                    # or if we get a specific error response that indicates the server was expecting more data
-                    
-                    is_vulnerable = False
-                    reason = "No delay detected"
-                    
-                    # First detection method: timing
-                    # If the response takes significantly longer than the baseline, likely vulnerable
-                    if response_time > baseline_response_time * 3:
-                        is_vulnerable = True
-                        reason = f"Response time ({response_time:.3f}s) is more than 3x the baseline ({baseline_response_time:.3f}s)"
-                        if verbose:
-                            logger.info(f"POTENTIAL VULNERABILITY DETECTED: {reason}")
-                    
-                    # Second detection method: error responses
-                    # Some servers will respond with specific error codes when they're waiting for more data
-                    if test_response.get('status_code') in [408, 400, 500]:
+                        # Record start time
+                        start_time = time.time()
+                        
+                        # Use send_malformed_headers for all tests to ensure headers are sent exactly as specified
+                        test_response, _ = await client.send_malformed_headers(
+                            method="POST",
+                            path=path,
+                            headers=test_headers,
+                            body=body_content.encode(),
+                        )
+                        
+                        # Record end time and calculate response time
+                        end_time = time.time()
+                        response_time = end_time - start_time
+                        
+                        # Log response details for debugging
                         if verbose:
-                            logger.info(f"Suspicious status code: {test_response.get('status_code')}")
-                        # Check if this is a timeout or bad request that could indicate a smuggling issue
-                        if response_time > baseline_response_time * 1.5:
+                            logger.info(f"Response Status: {test_response.get('status_code')}")
+                            logger.info(f"Response Time: {response_time:.6f}s")
+                            logger.info(f"Baseline Response Time: {baseline_response_time:.6f}s")
+                            logger.info(f"Time Difference: {response_time - baseline_response_time:.6f}s")
+                            logger.info(f"Ratio: {response_time / baseline_response_time:.2f}x")
+                        
+                        # A vulnerability is detected if the response time is significantly longer
+                        # than the baseline (indicating the server was waiting for more data)
+                        # or if we get a specific error response that indicates the server was expecting more data
+                        
+                        is_vulnerable = False
+                        reason = "No delay detected"
+                        
+                        # First detection method: timing
+                        # If the response takes significantly longer than the baseline, likely vulnerable
+                        if response_time > baseline_response_time * 3:
                             is_vulnerable = True
-                            reason = f"Status code {test_response.get('status_code')} with increased response time ({response_time:.3f}s vs baseline {baseline_response_time:.3f}s)"
+                            reason = f"Response time ({response_time:.3f}s) is more than 3x the baseline ({baseline_response_time:.3f}s)"
                             if verbose:
                                 logger.info(f"POTENTIAL VULNERABILITY DETECTED: {reason}")
-                    
-                    # Record the test result
-                    test_result = {
-                        'is_vulnerable': is_vulnerable,
-                        'response_time': response_time,
-                        'baseline_time': baseline_response_time,
-                        'time_difference': response_time - baseline_response_time,
-                        'time_ratio': response_time / baseline_response_time if baseline_response_time > 0 else 0,
-                        'reason': reason,
-                        'description': mutation["description"],
-                        'header_name': header_name,
-                        'header_value': header_value,
-                        'placement_type': mutation["type"],
-                    }
-                    
-                    # Add to overall results if vulnerable
-                    if is_vulnerable:
-                        logger.info(f"Vulnerability detected: {reason}")
-                        results["findings"].append(test_result)
-                        results["vulnerable"] = True
                         
-                        # Optionally stop after finding the first vulnerability
-                        if exit_first:
-                            logger.info("Stopping after finding a vulnerability (--exit-first flag)")
-                            break
+                        # Second detection method: error responses
+                        # Some servers will respond with specific error codes when they're waiting for more data
+                        if test_response.get('status_code') in [408, 400, 500]:
+                            if verbose:
+                                logger.info(f"Suspicious status code: {test_response.get('status_code')}")
+                            # Check if this is a timeout or bad request that could indicate a smuggling issue
+                            if response_time > baseline_response_time * 1.5:
+                                is_vulnerable = True
+                                reason = f"Status code {test_response.get('status_code')} with increased response time ({response_time:.3f}s vs baseline {baseline_response_time:.3f}s)"
+                                if verbose:
+                                    logger.info(f"POTENTIAL VULNERABILITY DETECTED: {reason}")
+                        
+                        # Record the test result
+                        test_result = {
+                            'is_vulnerable': is_vulnerable,
+                            'response_time': response_time,
+                            'baseline_time': baseline_response_time,
+                            'time_difference': response_time - baseline_response_time,
+                            'time_ratio': response_time / baseline_response_time if baseline_response_time > 0 else 0,
+                            'reason': reason,
+                            'description': mutation["description"],
+                            'header_name': header_name,
+                            'header_value': header_value,
+                            'placement_type': mutation["type"],
+                        }
+                        
+                        # Add to overall results if vulnerable
+                        if is_vulnerable:
+                            logger.info(f"Vulnerability detected: {reason}")
+                            results["findings"].append(test_result)
+                            results["vulnerable"] = True
+                            
+                            # Optionally stop after finding the first vulnerability
+                            if exit_first:
+                                logger.info("Stopping after finding a vulnerability (--exit-first flag)")
+                                break
                 except Exception as e:
                     logger.error(f"Error during test execution: {e}")
                     results['errors'].append({
@@ -316,8 +305,6 @@ async def test_h2_cl_vulnerability(
                         'header_value': header_value,
                         'error': str(e),
                     })
-                finally:
-                    await client.close()
             except Exception as e:
                 logger.error(f"Error preparing test: {e}")
                 results['errors'].append({
@@ -330,7 +317,7 @@ async def test_h2_cl_vulnerability(
             'error': str(e),
         })
     finally:
-        await client.close()
+        await pool.close()
     
     return results
 
@@ -8,56 +8,138 @@ headers to test for TE.CL vulnerabilities using the time-delay technique.
 
 import argparse
 import asyncio
+import functools
 import json
 import os
 import sys
 import time
-import urllib.parse
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import from project
 from src.clients.http1 import HTTP1Client
+from src.utils.target import TargetSpec, build_request_template, encode_header_text
 from src.utils.logging import setup_logging
 from colorama import Fore, Style, init
 
 # Initialize colorama
 init(autoreset=True)
 
-async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = False, timeout: float = 5.0, custom_headers: List[Tuple[str, str]] = None) -> Dict:
+# ANSI color codes, looked up once
+C_CYAN = Fore.CYAN
+C_GREEN = Fore.GREEN
+C_RED = Fore.RED
+C_YELLOW = Fore.YELLOW
+C_RESET = Style.RESET_ALL
+
+# Single-line [done/total] progress indicator, redrawn in place
+PROGRESS_FORMAT = f"\r{C_CYAN}[%d/%d]{C_RESET} Testing header variation"
+
+# Start of the line announcing a potential vulnerability, before the variation description
+VULNERABLE_PREFIX = f"\n{C_RED}[!] Potential TE.CL vulnerability detected{C_RESET} with header variation: {C_YELLOW}"
+
+# Header variations tested at the same time by default
+DEFAULT_CONCURRENCY = 8
+
+# How many times longer than the baseline request a timed-out probe must
+# have taken to count, so a target that is slow anyway is not reported
+MIN_TIME_RATIO = 1.5
+
+# Content-Length of the probe (the whole body) and of the confirmation (one byte short)
+PROBE_CONTENT_LENGTH = b"Content-Length: 6\r\n"
+CONFIRM_CONTENT_LENGTH = b"Content-Length: 5\r\n"
+
+# Probe body according to the example in the screenshot.
+# If front-end uses Transfer-Encoding and back-end uses Content-Length,
+# the front-end will only forward the '0\r\n\r\n' part (terminating chunk)
+# and the back-end will time out waiting for the 'X' to arrive
+TE_CL_BODY = (
+    # Terminating chunk
+    b"0\r\n"
+    b"\r\n"
+    # Character 'X' that won't be sent if front-end uses Transfer-Encoding
+    b"X"
+)
+
+# Transfer-Encoding header variations tested when no headers file is given.
+# Shared between scans and must not be modified.
+DEFAULT_TE_HEADERS = (
+    {
+        "description": "Standard chunked encoding",
+        "header_name": "Transfer-Encoding",
+        "header_value": "chunked"
+    },
+    {
+        "description": "Space after header name",
+        "header_name": "Transfer-Encoding ",
+        "header_value": "chunked"
+    },
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_headers(path: str, mtime: float) -> Tuple[Dict, ...]:
+    """Load the Transfer-Encoding header variations from a JSON file.
+    
+    Cached per path and modification time, so repeated scans with the same
+    file parse it once. The returned entries are shared and must not be modified.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    headers_data = orjson.loads(data) if orjson is not None else json.loads(data)
+    te_headers = []
+    for entry in headers_data:
+        # Extract header from each entry
+        header = {
+            'description': entry.get('description', ''),
+            'header_name': entry.get('header_name'),
+            'header_value': entry.get('header_value'),
+            'extra_headers': entry.get('extra_headers', [])
+        }
+        if header['header_name'] and header['header_value']:
+            te_headers.append(header)
+    return tuple(te_headers)
+
+
+# Control characters shown as escape sequences when printing header variations
+ESCAPE_TABLE = str.maketrans({'\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+
+def _escape(text: str) -> str:
+    """Escape newlines, carriage returns and tabs in header text for display."""
+    return text.translate(ESCAPE_TABLE)
+
+
+async def test_te_cl_with_header(spec: TargetSpec, te_header: Dict, verbose: bool = False, timeout: float = 5.0, custom_headers: List[Tuple[str, str]] = None,
+                                 template: Optional[Tuple[bytes, bytes]] = None) -> Dict:
     """Test for TE.CL vulnerability using a specific Transfer-Encoding header variation.
     
     Args:
-        url: Target URL
+        spec: Parsed target
         te_header: Transfer-Encoding header to use (dictionary with header_name and header_value)
         verbose: Whether to enable verbose output
         timeout: Request timeout in seconds
         custom_headers: Additional headers to include in the request
+        template: Prebuilt (base_prefix, custom_headers_blob) from build_request_template;
+            built from spec and custom_headers if not given
         
     Returns:
-        Dictionary with test results
+        Dictionary with test results; raw requests are stored as bytes
     """
-    # Parse URL
-    parsed_url = urllib.parse.urlparse(url)
-    scheme = parsed_url.scheme.lower()
-    host = parsed_url.netloc
-    path = parsed_url.path or '/'
-    
-    if ':' in host:
-        host, port_str = host.rsplit(':', 1)
-        port = int(port_str)
-    else:
-        port = 443 if scheme == 'https' else 80
-        
-    use_tls = scheme == 'https'
+    base_prefix, custom_headers_blob = template or build_request_template(spec, custom_headers)
     
     if verbose:
-        print(f"\nTesting with header: {te_header['header_name']}:{te_header['header_value'].replace('\n', '\\n')}")
+        print(f"\nTesting with header: {te_header['header_name']}:{_escape(te_header['header_value'])}")
     
     # Create HTTP client for this test
     test_client = HTTP1Client(
-        host=host,
-        port=port,
-        use_tls=use_tls,
+        host=spec.host,
+        port=spec.port,
+        use_tls=spec.use_tls,
         timeout=timeout,
         connect_timeout=5.0,
     )
@@ -68,7 +150,7 @@ async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = Fals
         'timed_out': False,
         'time_ratio': 0,
         'test_time': 0,
-        'raw_request': '',
+        'raw_request': b'',
         'status_code': None,
         'error': None
     }
@@ -76,54 +158,22 @@ async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = Fals
     try:
         await test_client.connect()
         
-        # Prepare headers with Content-Length and the specified Transfer-Encoding variation
-        headers = [
-            ('Host', host),
-            ('Content-Type', 'application/x-www-form-urlencoded'),
-            ('Content-Length', '6'),  # Matches the example in the screenshot
-        ]
+        # Encode the Transfer-Encoding variation and any extra headers; everything
+        # else in the request head comes from the shared template
+        variation = encode_header_text(f"{te_header['header_name']}: {te_header['header_value']}\r\n")
+        for extra_header in te_header.get('extra_headers', ()):
+            variation += encode_header_text(f"{extra_header['header_name']}: {extra_header['header_value']}\r\n")
         
-        # Add any custom headers provided
-        if custom_headers:
-            headers.extend(custom_headers)
-            
-        # Process the Transfer-Encoding header
-        # Add the main header
-        headers.append((te_header['header_name'], te_header['header_value']))
-        
-        # Add any extra headers if present
-        if 'extra_headers' in te_header:
-            for extra_header in te_header['extra_headers']:
-                headers.append((extra_header['header_name'], extra_header['header_value']))
-        
-        # Prepare body according to the example in the screenshot
-        # If front-end uses Transfer-Encoding and back-end uses Content-Length,
-        # the front-end will only forward the '0\r\n\r\n' part (terminating chunk)
-        # and the back-end will time out waiting for the 'X' to arrive
-        body = (
-            # Terminating chunk
-            b"0\r\n"
-            b"\r\n"
-            # Character 'X' that won't be sent if front-end uses Transfer-Encoding
-            b"X"
-        )
-        
-        # Build the raw request for later display if vulnerability is found
-        raw_request = f"POST {path} HTTP/1.1\r\n"
-        for name, value in headers:
-            raw_request += f"{name}: {value}\r\n"
-        raw_request += "\r\n"
-        raw_request += body.decode('utf-8', errors='replace')
-        
-        result['raw_request'] = raw_request
+        # Content-Length matches the example in the screenshot
+        raw_request = base_prefix + PROBE_CONTENT_LENGTH + custom_headers_blob + variation + b"\r\n" + TE_CL_BODY
         
         start_time = time.time()
         try:
             test_info, _ = await test_client.send_request(
                 method="POST",
-                path=path,
-                headers=headers,
-                body=body,
+                path=spec.path,
+                headers=[],
+                raw_request=raw_request,
             )
             test_time = time.time() - start_time
             result['timed_out'] = False
@@ -149,37 +199,13 @@ async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = Fals
         # send a third request with modified Content-Length and same body
         # to confirm the vulnerability
         if result['timed_out']:
-            if verbose:
-                print(f"{Fore.CYAN}Potential vulnerability detected (request timed out), sending confirmation request...{Style.RESET_ALL}")
-            
-            # Prepare headers with modified Content-Length and the same Transfer-Encoding variation
-            confirm_headers = [
-                ('Host', host),
-                ('Content-Type', 'application/x-www-form-urlencoded'),
-                ('Content-Length', '5'),  # Changed from 6 to 5 as requested
-            ]
+            result['raw_request'] = raw_request
             
-            # Add any custom headers provided
-            if custom_headers:
-                confirm_headers.extend(custom_headers)
-                
-            # Process the Transfer-Encoding header the same way as before
-            confirm_headers.append((te_header['header_name'], te_header['header_value']))
-            
-            # Add any extra headers if present
-            if 'extra_headers' in te_header:
-                for extra_header in te_header['extra_headers']:
-                    confirm_headers.append((extra_header['header_name'], extra_header['header_value']))
-            
-            # Use the same body as the test request
-            confirm_body = body
+            if verbose:
+                print(f"{C_CYAN}Potential vulnerability detected (request timed out), sending confirmation request...{C_RESET}")
             
-            # Build the raw request for later display
-            confirm_raw_request = f"POST {path} HTTP/1.1\r\n"
-            for name, value in confirm_headers:
-                confirm_raw_request += f"{name}: {value}\r\n"
-            confirm_raw_request += "\r\n"
-            confirm_raw_request += confirm_body.decode('utf-8', errors='replace')
+            # Same head and body with a modified Content-Length (changed from 6 to 5 as requested)
+            confirm_raw_request = base_prefix + CONFIRM_CONTENT_LENGTH + custom_headers_blob + variation + b"\r\n" + TE_CL_BODY
             
             result['confirm_raw_request'] = confirm_raw_request
             
@@ -187,9 +213,9 @@ async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = Fals
             try:
                 confirm_info, _ = await test_client.send_request(
                     method="POST",
-                    path=path,
-                    headers=confirm_headers,
-                    body=confirm_body,
+                    path=spec.path,
+                    headers=[],
+                    raw_request=confirm_raw_request,
                 )
                 confirm_time = time.time() - confirm_start_time
                 result['confirm_timed_out'] = False
@@ -204,7 +230,7 @@ async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = Fals
                 # (A properly formatted request is processed normally)
                 result['vulnerable'] = True
                 if verbose:
-                    print(f"{Fore.RED}Vulnerability confirmed! The modified request completed successfully.{Style.RESET_ALL}")
+                    print(f"{C_RED}Vulnerability confirmed! The modified request completed successfully.{C_RESET}")
                 
             except asyncio.TimeoutError:
                 confirm_time = time.time() - confirm_start_time
@@ -229,9 +255,14 @@ async def test_te_cl_with_header(url: str, te_header: Dict, verbose: bool = Fals
 
 
 async def test_te_cl(url: str, verbose: bool = False, timeout: float = 5.0, 
-                    exit_first: bool = False, headers_file: str = None, custom_headers: List[Tuple[str, str]] = None):
+                    exit_first: bool = False, headers_file: str = None, custom_headers: List[Tuple[str, str]] = None,
+                    concurrency: int = DEFAULT_CONCURRENCY):
     """Test for TE.CL vulnerability using time-delay technique with multiple header variations.
     
+    Each variation uses its own connection, so up to concurrency variations
+    are tested at the same time. Findings are printed as they come in and
+    summarized in the order of the header variations.
+    
     Args:
         url: Target URL
         verbose: Whether to enable verbose output
@@ -239,6 +270,7 @@ async def test_te_cl(url: str, verbose: bool = False, timeout: float = 5.0,
         exit_first: Whether to stop after finding the first vulnerability
         headers_file: Path to file containing Transfer-Encoding header variations
         custom_headers: Additional headers to include in all requests
+        concurrency: Maximum number of header variations tested at the same time
         
     Returns:
         List of vulnerable headers found, empty list if none
@@ -250,51 +282,33 @@ async def test_te_cl(url: str, verbose: bool = False, timeout: float = 5.0,
     if verbose:
         print(f"Debug: URL received by TE.CL detector: '{url}'")
     
-    print(f"{Fore.CYAN}Testing {url} for TE.CL vulnerability...{Style.RESET_ALL}")
+    print(f"{C_CYAN}Testing {url} for TE.CL vulnerability...{C_RESET}")
     
     # Load Transfer-Encoding header variations
     if headers_file and os.path.exists(headers_file):
         try:
-            with open(headers_file, 'r') as f:
-                # Load headers from JSON file
-                headers_data = json.load(f)
-                te_headers = []
-                for entry in headers_data:
-                    # Extract header from each entry
-                    header = {
-                        'header_name': entry.get('header_name'),
-                        'header_value': entry.get('header_value'),
-                        'extra_headers': entry.get('extra_headers', [])
-                    }
-                    if header['header_name'] and header['header_value']:
-                        te_headers.append(header)
-                    
-            print(f"{Fore.CYAN}Loaded {len(te_headers)} header variations from {headers_file}{Style.RESET_ALL}")
+            # Load headers from JSON file
+            path = os.path.abspath(headers_file)
+            te_headers = list(_load_headers(path, os.path.getmtime(path)))
+            
+            print(f"{C_CYAN}Loaded {len(te_headers)} header variations from {headers_file}{C_RESET}")
         except Exception as e:
-            print(f"{Fore.RED}Error loading headers file: {e}{Style.RESET_ALL}")
+            print(f"{C_RED}Error loading headers file: {e}{C_RESET}")
             te_headers = []
     else:
         # Default list of Transfer-Encoding header variations
-        te_headers = [
-            {
-                "description": "Standard chunked encoding",
-                "header_name": "Transfer-Encoding",
-                "header_value": "chunked"
-            },
-            {
-                "description": "Space after header name",
-                "header_name": "Transfer-Encoding ",
-                "header_value": "chunked"
-            }
-        ]
-        print(f"{Fore.CYAN}Using {len(te_headers)} default header variations{Style.RESET_ALL}")
+        te_headers = list(DEFAULT_TE_HEADERS)
+        print(f"{C_CYAN}Using {len(te_headers)} default header variations{C_RESET}")
 
+    # Parse the target once for the baseline and every variation
+    spec = TargetSpec.from_url(url)
+    
     # First, send a normal request to establish baseline response time
-    print(f"\n{Fore.CYAN}Sending baseline request...{Style.RESET_ALL}")
+    print(f"\n{C_CYAN}Sending baseline request...{C_RESET}")
     baseline_client = HTTP1Client(
-        host=urllib.parse.urlparse(url).netloc.split(':')[0],
-        port=443 if url.startswith('https') else 80,
-        use_tls=url.startswith('https'),
+        host=spec.host,
+        port=spec.port,
+        use_tls=spec.use_tls,
         timeout=timeout,
         connect_timeout=5.0,
     )
@@ -305,72 +319,108 @@ async def test_te_cl(url: str, verbose: bool = False, timeout: float = 5.0,
         start_time = time.time()
         baseline_info, _ = await baseline_client.send_request(
             method="GET",
-            path=urllib.parse.urlparse(url).path or '/',
-            headers=[("Host", urllib.parse.urlparse(url).netloc)],
+            path=spec.path,
+            headers=[("Host", spec.netloc)],
         )
         baseline_time = time.time() - start_time
         
-        print(f"{Fore.CYAN}Baseline response time: {baseline_time:.3f} seconds{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Baseline status code: {baseline_info['status_code']}{Style.RESET_ALL}")
+        print(f"{C_CYAN}Baseline response time: {baseline_time:.3f} seconds{C_RESET}")
+        print(f"{C_CYAN}Baseline status code: {baseline_info['status_code']}{C_RESET}")
     finally:
         await baseline_client.close()
     
-    # Test each header variation
+    # The request head is identical across variations apart from the
+    # Transfer-Encoding header, so it is encoded once for the whole sweep
+    template = build_request_template(spec, custom_headers)
+    
+    total = len(te_headers)
+    
+    # Test the header variations, at most concurrency at a time
     vulnerable_headers = []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
     
-    for i, te_header in enumerate(te_headers):
-        print(f"\r{Fore.CYAN}[{i+1}/{len(te_headers)}]{Style.RESET_ALL} Testing header variation", end="")
-        sys.stdout.flush()
-        
-        result = await test_te_cl_with_header(url, te_header, verbose, timeout, custom_headers)
-        
-        # Determine if this variation indicates a vulnerability
-        if result['timed_out'] or result.get('vulnerable', False):
-            # Print newline if we're using the progress indicator
-            if not verbose:
-                print()
+    async def run(te_header: Dict) -> Dict:
+        async with semaphore:
+            return await test_te_cl_with_header(spec, te_header, verbose, timeout, custom_headers, template)
+    
+    tasks = {asyncio.create_task(run(te_header)): index for index, te_header in enumerate(te_headers)}
+    pending = set(tasks)
+    tested_count = 0
+    stop = False
+    try:
+        while pending and not stop:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = tasks[task]
+                te_header = te_headers[index]
+                result = task.result()
+                tested_count += 1
+                sys.stdout.write(PROGRESS_FORMAT % (tested_count, total))
+                sys.stdout.flush()
                 
-            # Get the description of the header variation
-            description = te_header['description']
-            
-            print(f"\n{Fore.RED}[!] Potential TE.CL vulnerability detected{Style.RESET_ALL} with header variation: {Fore.YELLOW}{description}{Style.RESET_ALL}")
-            
-            # Display the header with escaped control characters for clarity
-            escaped_header = te_header['header_value'].replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            print(f"{Fore.CYAN}Header used: {te_header['header_name']}: {escaped_header}{Style.RESET_ALL}")
-            
-            print(f"\n{Fore.CYAN}Raw request that triggered the vulnerability:{Style.RESET_ALL}")
-            print(result['raw_request'])
-            
-            vulnerable_headers.append((te_header, description))
-            
-            if exit_first:
-                print(f"\n{Fore.YELLOW}Stopping tests as requested (--exit-first){Style.RESET_ALL}")
-                break
+                # Calculate time ratio compared to baseline
+                if baseline_time > 0 and result['test_time'] > 0:
+                    time_ratio = result['test_time'] / baseline_time
+                else:
+                    time_ratio = 0
+                
+                # Determine if this variation indicates a vulnerability; a timeout
+                # only counts if the probe was clearly slower than the baseline
+                if result['timed_out'] and (time_ratio == 0 or time_ratio >= MIN_TIME_RATIO):
+                    # Print newline if we're using the progress indicator
+                    if not verbose:
+                        print()
+                    
+                    # Get the description of the header variation
+                    description = te_header['description']
+                    
+                    print(f"{VULNERABLE_PREFIX}{description}{C_RESET}")
+                    print(f"The test request took {C_YELLOW}{time_ratio:.1f}x{C_RESET} longer than the baseline request.")
+                    
+                    # Display the header with escaped control characters for clarity
+                    escaped_header = _escape(te_header['header_value'])
+                    print(f"{C_CYAN}Header used: {te_header['header_name']}: {escaped_header}{C_RESET}")
+                    
+                    print(f"\n{C_CYAN}Raw request that triggered the vulnerability:{C_RESET}")
+                    print(result['raw_request'].decode('utf-8', errors='replace'))
+                    
+                    vulnerable_headers.append((index, te_header, description))
+                    
+                    if exit_first:
+                        stop = True
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
+    if stop:
+        print(f"\n{C_YELLOW}Stopping tests as requested (--exit-first){C_RESET}")
+    
+    # Summarize in the order of the header variations, not of completion
+    vulnerable_headers.sort(key=lambda entry: entry[0])
     
     # Print newline if we're using the progress indicator and didn't find a vulnerability
     if not verbose and not vulnerable_headers:
         print()
     
     # Summarize results
-    print(f"\n{Fore.CYAN}" + "=" * 60 + f"{Style.RESET_ALL}")
+    print(f"\n{C_CYAN}" + "=" * 60 + f"{C_RESET}")
     # Show the actual number of tested headers, not the total available
-    tested_count = min(len(te_headers), i+1) if 'i' in locals() else len(te_headers)
-    print(f"{Fore.CYAN}Results Summary:{Style.RESET_ALL} Tested {tested_count} of {len(te_headers)} header variations")
-    print(f"{Fore.CYAN}" + "=" * 60 + f"{Style.RESET_ALL}")
+    print(f"{C_CYAN}Results Summary:{C_RESET} Tested {tested_count} of {total} header variations")
+    print(f"{C_CYAN}" + "=" * 60 + f"{C_RESET}")
     
     findings = []
     if vulnerable_headers:
-        print(f"\n{Fore.RED}[!] Found {len(vulnerable_headers)} potential TE.CL vulnerabilities!{Style.RESET_ALL}")
-        print(f"\n{Fore.CYAN}Vulnerable headers:{Style.RESET_ALL}")
-        for header, description in vulnerable_headers:
+        print(f"\n{C_RED}[!] Found {len(vulnerable_headers)} potential TE.CL vulnerabilities!{C_RESET}")
+        print(f"\n{C_CYAN}Vulnerable headers:{C_RESET}")
+        for _, header, description in vulnerable_headers:
             # Display the header with escaped control characters for clarity
-            escaped_header = f"{header['header_name']}:{header['header_value'].replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')}"
-            print(f"Header_Description: {Fore.YELLOW}{description}{Style.RESET_ALL}")
-            print(f"Actual_Header_Name: {Fore.CYAN}{header['header_name'].replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')}{Style.RESET_ALL}")
-            print(f"Actual_Header_Value: {Fore.CYAN}{header['header_value'].replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')}{Style.RESET_ALL}")
-            print(f"Vulnerability_Type: {Fore.CYAN}TE.CL{Style.RESET_ALL}")
-            print(f"Vulnerable_URL: {Fore.CYAN}{url}{Style.RESET_ALL}")
+            escaped_header = f"{header['header_name']}:{_escape(header['header_value'])}"
+            print(f"Header_Description: {C_YELLOW}{description}{C_RESET}")
+            print(f"Actual_Header_Name: {C_CYAN}{_escape(header['header_name'])}{C_RESET}")
+            print(f"Actual_Header_Value: {C_CYAN}{_escape(header['header_value'])}{C_RESET}")
+            print(f"Vulnerability_Type: {C_CYAN}TE.CL{C_RESET}")
+            print(f"Vulnerable_URL: {C_CYAN}{url}{C_RESET}")
             print()
             
             # Add to findings list for return value
@@ -380,7 +430,7 @@ async def test_te_cl(url: str, verbose: bool = False, timeout: float = 5.0,
                 "type": "TE.CL"
             })
     else:
-        print(f"\n{Fore.GREEN}No TE.CL vulnerabilities detected with any of the tested header variations.{Style.RESET_ALL}")
+        print(f"\n{C_GREEN}No TE.CL vulnerabilities detected with any of the tested header variations.{C_RESET}")
     
     return findings
 
@@ -393,6 +443,7 @@ def main():
     parser.add_argument("-e", "--exit-first", action="store_true", help="Stop after finding the first vulnerability")
     parser.add_argument("-f", "--file", help="Path to file containing Transfer-Encoding header variations")
     parser.add_argument("-H", "--header", action="append", help="Custom header to include in requests (format: 'Name: Value')")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Number of header variations to test at the same time")
     
     args = parser.parse_args()
     
@@ -404,20 +455,20 @@ def main():
                 name, value = header_str.split(':', 1)
                 custom_headers.append((name.strip(), value.strip()))
             except ValueError:
-                print(f"{Fore.RED}Invalid header format: {header_str}. Use 'Name: Value' format.{Style.RESET_ALL}")
+                print(f"{C_RED}Invalid header format: {header_str}. Use 'Name: Value' format.{C_RESET}")
                 sys.exit(1)
     
-    findings = asyncio.run(test_te_cl(args.url, args.verbose, args.timeout, args.exit_first, args.file, custom_headers))
+    findings = asyncio.run(test_te_cl(args.url, args.verbose, args.timeout, args.exit_first, args.file, custom_headers, args.concurrency))
     
     if findings:
-        print(f"\n{Fore.RED}[!] Found {len(findings)} potential TE.CL vulnerabilities!{Style.RESET_ALL}")
-        print(f"\n{Fore.CYAN}Vulnerable headers:{Style.RESET_ALL}")
+        print(f"\n{C_RED}[!] Found {len(findings)} potential TE.CL vulnerabilities!{C_RESET}")
+        print(f"\n{C_CYAN}Vulnerable headers:{C_RESET}")
         for finding in findings:
-            print(f"- {Fore.YELLOW}{finding['description']}{Style.RESET_ALL}")
-            print(f"  Header: {Fore.CYAN}{finding['header']}{Style.RESET_ALL}")
+            print(f"- {C_YELLOW}{finding['description']}{C_RESET}")
+            print(f"  Header: {C_CYAN}{finding['header']}{C_RESET}")
             print()
     else:
-        print(f"\n{Fore.GREEN}No TE.CL vulnerabilities detected with any of the tested header variations.{Style.RESET_ALL}")
+        print(f"\n{C_GREEN}No TE.CL vulnerabilities detected with any of the tested header variations.{C_RESET}")
 
 
 if __name__ == "__main__":
@@ -4,29 +4,64 @@ Logging utilities for the HTTP Request Smuggling Detection Tool.
 This module provides logging configuration and helper functions.
 """
 
+import contextvars
 import logging
 import sys
 from typing import Optional
 
-from rich.console import Console
-from rich.logging import RichHandler
+
+# Whether setup_logging has already configured the application logger
+_logging_configured = False
+
+# Verbose flag of the scan running in the current asyncio context. Scans run
+# through run_scan_api share one process and one logger, so each scan sets
+# this instead of changing logger or handler levels; None outside such scans.
+scan_verbose: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar(
+    'scan_verbose', default=None
+)
+
+
+class ScanVerbosityFilter(logging.Filter):
+    """Drop DEBUG records unless they were logged by a verbose scan."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or bool(scan_verbose.get())
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """Return whether debug messages from the current context would be logged.
+    
+    Like logger.isEnabledFor(logging.DEBUG), but also False inside a
+    non-verbose scan, so callers can skip building debug output.
+    """
+    return logger.isEnabledFor(logging.DEBUG) and scan_verbose.get() is not False
 
 
 def setup_logging(
     level: int = logging.INFO,
     log_file: Optional[str] = None,
     verbose: bool = False,
+    reconfigure: bool = False,
 ) -> logging.Logger:
     """Set up logging for the application.
     
+    Only the first call configures the logger. Detectors call this on every
+    run, and would otherwise rebuild the handlers each time and drop the
+    log file set up by the CLI.
+    
     Args:
         level: Logging level (e.g., logging.INFO, logging.DEBUG)
         log_file: Optional file path to write logs to
         verbose: Whether to enable verbose logging
+        reconfigure: Replace the existing configuration even if already set up
         
     Returns:
         Configured logger
     """
+    global _logging_configured
+    if _logging_configured and not reconfigure:
+        return logging.getLogger('hrs_finder')
+    
     # Create logger
     logger = logging.getLogger('hrs_finder')
     logger.setLevel(logging.DEBUG if verbose else level)
@@ -35,16 +70,25 @@ def setup_logging(
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
     
-    # Create console handler with rich formatting
-    console = Console(stderr=True)
-    console_handler = RichHandler(
-        console=console,
-        show_path=True,  # Always show path
-        show_time=True,  # Always show time
-        markup=True,
-        rich_tracebacks=True,
-        enable_link_path=True,  # Enable clickable file paths in supported terminals
-    )
+    if verbose:
+        # Rich formatting is only worth its per-record cost in verbose runs,
+        # so it is only imported here
+        from rich.console import Console
+        from rich.logging import RichHandler
+        
+        # Create console handler with rich formatting
+        console = Console(stderr=True)
+        console_handler = RichHandler(
+            console=console,
+            show_path=True,  # Always show path
+            show_time=True,  # Always show time
+            markup=True,
+            rich_tracebacks=True,
+            enable_link_path=True,  # Enable clickable file paths in supported terminals
+        )
+    else:
+        # Plain console handler for quiet scans
+        console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setLevel(logging.DEBUG if verbose else level)
     
     # Set format to include timestamp, filename, line number
@@ -70,6 +114,7 @@ def setup_logging(
         file_handler.setLevel(logging.DEBUG)
         logger.addHandler(file_handler)
     
+    _logging_configured = True
     return logger
 
 
@@ -100,7 +145,7 @@ def log_request(
         body: Request body
         raw: Raw request bytes
     """
-    if logger.level > logging.DEBUG:
+    if not debug_enabled(logger):
         return
         
     if raw:
@@ -108,22 +153,15 @@ def log_request(
         try:
             logger.debug(raw.decode('utf-8', errors='replace'))
         except Exception:
-            logger.debug(f"<Binary data: {len(raw)} bytes>")
+            logger.debug("<Binary data: %d bytes>", len(raw))
         return
         
-    logger.debug(f"Sending {method} request to {path}")
+    logger.debug("Sending %s request to %s", method, path)
     for name, value in headers:
-        logger.debug(f"  {name}: {value}")
+        logger.debug("  %s: %s", name, value)
         
     if body:
-        try:
-            body_text = body.decode('utf-8', errors='replace')
-            if len(body_text) > 1024:
-                logger.debug(f"  Body: {body_text[:1024]}... ({len(body)} bytes)")
-            else:
-                logger.debug(f"  Body: {body_text}")
-        except Exception:
-            logger.debug(f"  Body: <Binary data: {len(body)} bytes>")
+        _log_body(logger, body)
 
 
 def log_response(
@@ -142,18 +180,27 @@ def log_response(
         body: Response body
         response_time: Response time in seconds
     """
-    if logger.level > logging.DEBUG:
+    if not debug_enabled(logger):
         return
         
-    logger.debug(f"Received response: {status_code} ({response_time:.6f}s)")
+    logger.debug("Received response: %s (%.6fs)", status_code, response_time)
     for name, value in headers:
-        logger.debug(f"  {name}: {value}")
+        logger.debug("  %s: %s", name, value)
         
+    _log_body(logger, body)
+
+
+# Bytes of a body shown in debug logs
+BODY_PREVIEW_SIZE = 1024
+
+
+def _log_body(logger: logging.Logger, body: bytes) -> None:
+    """Log a request or response body, decoding at most BODY_PREVIEW_SIZE bytes of it."""
     try:
-        body_text = body.decode('utf-8', errors='replace')
-        if len(body_text) > 1024:
-            logger.debug(f"  Body: {body_text[:1024]}... ({len(body)} bytes)")
+        body_text = body[:BODY_PREVIEW_SIZE].decode('utf-8', errors='replace')
+        if len(body) > BODY_PREVIEW_SIZE:
+            logger.debug("  Body: %s... (%d bytes)", body_text, len(body))
         else:
-            logger.debug(f"  Body: {body_text}")
+            logger.debug("  Body: %s", body_text)
     except Exception:
-        logger.debug(f"  Body: <Binary data: {len(body)} bytes>")
+        logger.debug("  Body: <Binary data: %d bytes>", len(body))
@@ -0,0 +1,62 @@
+"""
+Target URL handling for the detectors.
+
+Detectors parse the target URL once per scan and share the result, and the
+encoded parts of the probe request built from it, between the baseline
+request and every header variation.
+"""
+
+import urllib.parse
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class TargetSpec:
+    """Connection details of a target URL, parsed once per scan."""
+    
+    host: str
+    port: int
+    use_tls: bool
+    path: str
+    netloc: str
+    
+    @classmethod
+    def from_url(cls, url: str) -> "TargetSpec":
+        """Parse a target URL (http(s)://hostname[:port][/path]).
+        
+        IPv6 literals (http://[::1]:8080/) are supported; host is the bare
+        address without brackets, as needed for connecting.
+        """
+        parsed_url = urllib.parse.urlparse(url)
+        use_tls = parsed_url.scheme.lower() == 'https'
+        port = parsed_url.port or (443 if use_tls else 80)
+        
+        return cls(parsed_url.hostname, port, use_tls, parsed_url.path or '/', parsed_url.netloc)
+
+
+def encode_header_text(text: str) -> bytes:
+    """Encode header text the same way HTTP1Client does when building requests."""
+    return text.encode('utf-8', 'surrogateescape')
+
+
+def build_request_template(spec: TargetSpec, custom_headers: List[Tuple[str, str]] = None) -> Tuple[bytes, bytes]:
+    """Encode the parts of the probe request that are the same for every header variation.
+    
+    Args:
+        spec: Parsed target
+        custom_headers: Additional headers to include in the request
+        
+    Returns:
+        Tuple of (base_prefix, custom_headers_blob): the request line with the
+        Host and Content-Type headers, and the encoded custom headers
+    """
+    base_prefix = encode_header_text(
+        f"POST {spec.path} HTTP/1.1\r\n"
+        f"Host: {spec.host}\r\n"
+        "Content-Type: application/x-www-form-urlencoded\r\n"
+    )
+    custom_headers_blob = b"".join(
+        encode_header_text(f"{name}: {value}\r\n") for name, value in custom_headers or ()
+    )
+    return base_prefix, custom_headers_blob
@@ -5,8 +5,17 @@ This module provides helper functions for setting up TLS connections
 with appropriate settings for HTTP/1.1 and HTTP/2.
 """
 
+import functools
 import ssl
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+
+# Maximum number of TLS sessions remembered for resumption
+MAX_CACHED_SESSIONS = 256
+
+# Most recently used TLS session per (host, port, context id), oldest first
+_session_cache: "OrderedDict[Tuple[str, int, int], ssl.SSLSession]" = OrderedDict()
 
 
 def create_ssl_context(
@@ -37,6 +46,27 @@ def create_ssl_context(
     return context
 
 
+@functools.lru_cache(maxsize=8)
+def get_shared_ssl_context(
+    alpn_protocols: Tuple[str, ...] = (),
+    verify: bool = False,
+) -> ssl.SSLContext:
+    """Get a process-wide SSL context for the given settings.
+    
+    Building a context loads the system CA bundle, so each combination of
+    settings is created once and shared by all clients. Callers must not
+    modify the returned context.
+    
+    Args:
+        alpn_protocols: ALPN protocols to advertise
+        verify: Whether to verify server certificates
+        
+    Returns:
+        Shared SSL context
+    """
+    return create_ssl_context(alpn_protocols=list(alpn_protocols) or None, verify=verify)
+
+
 def get_http1_ssl_context(verify: bool = False) -> ssl.SSLContext:
     """Get an SSL context configured for HTTP/1.1.
     
@@ -44,9 +74,9 @@ def get_http1_ssl_context(verify: bool = False) -> ssl.SSLContext:
         verify: Whether to verify server certificates
         
     Returns:
-        SSL context for HTTP/1.1
+        Shared SSL context for HTTP/1.1
     """
-    return create_ssl_context(alpn_protocols=['http/1.1'], verify=verify)
+    return get_shared_ssl_context(('http/1.1',), verify)
 
 
 def get_http2_ssl_context(verify: bool = False) -> ssl.SSLContext:
@@ -56,9 +86,85 @@ def get_http2_ssl_context(verify: bool = False) -> ssl.SSLContext:
         verify: Whether to verify server certificates
         
     Returns:
-        SSL context for HTTP/2
+        Shared SSL context for HTTP/2
+    """
+    return get_shared_ssl_context(('h2',), verify)
+
+
+class _ResumingContext:
+    """SSLContext stand-in that offers a cached session to the next handshake.
+    
+    asyncio creates the SSLObject itself, so the session is passed through
+    wrap_bio(); everything else is delegated to the wrapped context.
+    """
+    
+    __slots__ = ('_context', '_session')
+    
+    def __init__(self, context: ssl.SSLContext, session: ssl.SSLSession) -> None:
+        self._context = context
+        self._session = session
+    
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        return self._context.wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session or self._session,
+        )
+    
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+def resumable_context(
+    context: ssl.SSLContext,
+    host: str,
+    port: int,
+) -> Union[ssl.SSLContext, _ResumingContext]:
+    """Get the context to connect with, resuming a cached session if there is one.
+    
+    Args:
+        context: SSL context the connection uses
+        host: Target hostname
+        port: Target port
+        
+    Returns:
+        The context itself, or a wrapper that resumes the cached session
+    """
+    key = (host, port, id(context))
+    session = _session_cache.get(key)
+    if session is None:
+        return context
+    _session_cache.move_to_end(key)
+    return _ResumingContext(context, session)
+
+
+def store_session(
+    context: ssl.SSLContext,
+    host: str,
+    port: int,
+    ssl_object: Optional[ssl.SSLObject],
+) -> None:
+    """Remember the session of a connection for later resumption.
+    
+    TLS 1.3 servers send session tickets after the handshake, so this is
+    best called once a response has been read.
+    
+    Args:
+        context: SSL context the connection was made with
+        host: Target hostname
+        port: Target port
+        ssl_object: SSL object of the connection
     """
-    return create_ssl_context(alpn_protocols=['h2'], verify=verify)
+    session = getattr(ssl_object, 'session', None)
+    if session is None:
+        return
+    key = (host, port, id(context))
+    _session_cache[key] = session
+    _session_cache.move_to_end(key)
+    if len(_session_cache) > MAX_CACHED_SESSIONS:
+        _session_cache.popitem(last=False)
 
 
 def get_negotiated_protocol(ssl_object: ssl.SSLObject) -> Optional[str]: